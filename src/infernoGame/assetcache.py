@@ -0,0 +1,202 @@
+"""
+On-disk asset cache for InfernoGame.
+Decoded source images and the finished sprite images built from them
+(scaled, trimmed, flipped) are kept as raw pixel buffers in one bundle
+file, read in a single call at startup. Every entry remembers the
+modification time and size of the source file it came from, so editing
+an image rebuilds just what depends on it. The image folder is listed
+once instead of checking every file separately.
+"""
+import json
+import os
+import struct
+
+import pygame
+
+from settings import assetCacheFolder, imagesFolder
+
+bundleMagic = b"IFAC"
+# Bump when the way cached images are built changes
+bundleVersion = 1
+headerFormat = "<4sBI"  # magic, version, index length
+pixelFormat = "RGBA"
+
+
+class AssetCache:
+    """
+    Loads source images and memoizes images derived from them.
+    New or rebuilt entries are written back by save().
+    """
+
+    def __init__(self, folder=assetCacheFolder, sourceFolder=imagesFolder):
+        self.bundlePath = os.path.join(folder, "bundle.bin")
+        self.files = self.scan(sourceFolder)
+        # Source surface -> stamp of the file it was loaded from
+        self.sourceStamps = {}
+        self.entries = {}
+        self.blobs = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.loadBundle()
+
+    @staticmethod
+    def scan(folder):
+        """
+        Lists the image folder once: path -> (mtime in ns, size).
+        """
+        files = {}
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_file():
+                        info = entry.stat()
+                        files[os.path.normpath(entry.path)] = (
+                            info.st_mtime_ns, info.st_size
+                        )
+        except OSError:
+            pass
+        return files
+
+    def stamp(self, filePath):
+        return self.files.get(os.path.normpath(filePath))
+
+    def loadBundle(self):
+        try:
+            with open(self.bundlePath, "rb") as f:
+                data = f.read()
+            headerSize = struct.calcsize(headerFormat)
+            magic, version, indexLength = struct.unpack(
+                headerFormat, data[:headerSize]
+            )
+            if magic != bundleMagic or version != bundleVersion:
+                return
+            index = json.loads(data[headerSize:headerSize + indexLength])
+        except (IOError, ValueError, struct.error):
+            return
+        if not isinstance(index, dict):
+            return
+        offset = headerSize + indexLength
+        # Entries are views into the one buffer read above, not copies
+        data = memoryview(data)
+        for key, entry in index.items():
+            try:
+                start = offset + entry["offset"]
+                length = entry["length"]
+                width, height = entry["size"]
+                tuple(entry["stamp"])
+                valid = (
+                    start >= offset and start + length <= len(data) and
+                    length == width * height * len(pixelFormat)
+                )
+            except (KeyError, TypeError, ValueError):
+                valid = False
+            # A truncated or corrupt bundle only loses the bad entries,
+            # which are rebuilt from the source images
+            if valid:
+                self.entries[key] = entry
+                self.blobs[key] = data[start:start + length]
+
+    def fetch(self, key, stamp):
+        """
+        Returns the cached surface for 'key' if it was built from a file
+        with the same 'stamp', else None.
+        """
+        entry = self.entries.get(key)
+        if entry is None or tuple(entry["stamp"]) != tuple(stamp):
+            self.misses += 1
+            return None
+        try:
+            image = pygame.image.frombuffer(
+                self.blobs[key], tuple(entry["size"]), pixelFormat
+            )
+        except (ValueError, pygame.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Opaque images stay opaque, so blitting them needs no blending
+        if entry.get("perPixelAlpha", True):
+            image = image.convert_alpha()
+        else:
+            image = image.convert()
+        # Surface-wide settings are not part of the pixel buffer
+        if entry["alpha"] is not None:
+            image.set_alpha(entry["alpha"])
+        if entry["colorKey"] is not None:
+            image.set_colorkey(entry["colorKey"])
+        return image
+
+    def store(self, key, stamp, image):
+        colorKey = image.get_colorkey()
+        self.entries[key] = {
+            "size": image.get_size(),
+            "stamp": stamp,
+            "alpha": image.get_alpha(),
+            "colorKey": colorKey,
+            "perPixelAlpha": bool(image.get_flags() & pygame.SRCALPHA),
+        }
+        # tobytes() would bake the color key into the alpha channel
+        if colorKey is not None:
+            image.set_colorkey(None)
+        self.blobs[key] = pygame.image.tobytes(image, pixelFormat)
+        if colorKey is not None:
+            image.set_colorkey(colorKey)
+        self.dirty = True
+
+    def loadImage(self, filePath):
+        """
+        Returns the image at 'filePath' ready for use, or None when the
+        file does not exist.
+        """
+        stamp = self.stamp(filePath)
+        if stamp is None:
+            return None
+        key = "source:" + os.path.basename(filePath)
+        image = self.fetch(key, stamp)
+        if image is None:
+            image = pygame.image.load(filePath).convert_alpha()
+            self.store(key, stamp, image)
+        self.sourceStamps[image] = stamp
+        return image
+
+    def derive(self, key, source, builder):
+        """
+        Returns builder() for an image made from 'source', cached on disk
+        when 'source' came from loadImage().
+        """
+        stamp = self.sourceStamps.get(source)
+        if stamp is None:
+            return builder()
+        key = "derived:" + repr(key)
+        image = self.fetch(key, stamp)
+        if image is None:
+            image = builder()
+            self.store(key, stamp, image)
+        return image
+
+    def save(self):
+        """
+        Rewrites the bundle if anything was added since it was read.
+        Written next to the target and renamed, like replays.
+        """
+        if not self.dirty:
+            return
+        index = {}
+        offset = 0
+        for key, entry in self.entries.items():
+            length = len(self.blobs[key])
+            index[key] = dict(entry, offset=offset, length=length)
+            offset += length
+        indexBytes = json.dumps(index).encode("utf-8")
+
+        os.makedirs(os.path.dirname(self.bundlePath), exist_ok=True)
+        tempPath = self.bundlePath + ".tmp"
+        with open(tempPath, "wb") as f:
+            f.write(struct.pack(
+                headerFormat, bundleMagic, bundleVersion, len(indexBytes)
+            ))
+            f.write(indexBytes)
+            for key in index:
+                f.write(self.blobs[key])
+        os.replace(tempPath, self.bundlePath)
+        self.dirty = False
@@ -0,0 +1,91 @@
+"""
+Background rendering for InfernoGame.
+Backgrounds are scaled to the screen size and converted to the display
+format once, so every frame only has to blit ready-made surfaces.
+"""
+import pygame
+
+from settings import colorBlack
+
+
+class Background:
+    """
+    One full-screen background: an opaque base image plus optional
+    parallax layers that scroll at a fraction of the camera speed.
+    """
+
+    def __init__(self, source, layers=()):
+        self.source = source
+        # Each layer is (source image, parallax factor)
+        self.layers = list(layers)
+        self.size = None
+        self.base = None
+        self.scaledLayers = []
+        self.composed = None
+        self.composedOffset = None
+
+    def prepare(self, size):
+        """
+        Scales and converts the images for 'size'. Does nothing when they
+        are already prepared for that resolution.
+        """
+        if self.size == size:
+            return
+        self.size = size
+        self.base = None
+        if self.source:
+            self.base = pygame.transform.scale(self.source, size).convert()
+        self.scaledLayers = [
+            (pygame.transform.scale(image, size).convert_alpha(), factor)
+            for image, factor in self.layers
+        ]
+        self.composed = None
+        self.composedOffset = None
+
+    def draw(self, surface, scrollOffset=0):
+        self.prepare(surface.get_size())
+        if self.base:
+            surface.blit(self.base, (0, 0))
+        else:
+            surface.fill(colorBlack)
+
+        # Layers wrap around vertically, so two blits cover the screen
+        height = self.size[1]
+        for image, factor in self.scaledLayers:
+            y = int(scrollOffset * factor) % height
+            surface.blit(image, (0, y))
+            surface.blit(image, (0, y - height))
+
+    def getSurface(self, size, scrollOffset=0):
+        """
+        Returns the background as one screen-sized surface, for renderers
+        that restore it piece by piece. Layers are only recomposed when the
+        scroll offset changes.
+        """
+        self.prepare(size)
+        if self.base and not self.scaledLayers:
+            return self.base
+        if self.composed is None:
+            self.composed = pygame.Surface(size).convert()
+        if self.composedOffset != scrollOffset:
+            self.composedOffset = scrollOffset
+            self.draw(self.composed, scrollOffset)
+        return self.composed
+
+
+class BackgroundManager:
+    """
+    Named backgrounds for each screen of the game (start, game, game over).
+    """
+
+    def __init__(self):
+        self.backgrounds = {}
+
+    def add(self, name, source, layers=()):
+        self.backgrounds[name] = Background(source, layers)
+
+    def draw(self, surface, name, scrollOffset=0):
+        self.backgrounds[name].draw(surface, scrollOffset)
+
+    def getSurface(self, name, size, scrollOffset=0):
+        return self.backgrounds[name].getSurface(size, scrollOffset)
@@ -0,0 +1,232 @@
+"""
+Benchmark harness for InfernoGame's update and render hot paths.
+Drives scripted headless sessions at forced difficulty tiers and platform
+densities, and writes per-phase frame-time percentiles, allocations per
+frame and peak memory as JSON so runs can be compared between commits.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --tiers 3 --densities 1 10 --frames 600
+    python benchmark.py --output new.json --compare old.json
+    python benchmark.py --entity-store
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from settings import *
+from controls import RandomInput
+from main import InfernoGame
+from entities import EntityStore
+
+# Score needed to reach each difficulty tier (0 = no enemies)
+tierScores = (0, difficultyTier1, difficultyTier2, difficultyTier3)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(fraction * len(values)))
+    return values[index]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class BenchmarkSession:
+    """
+    One scenario: a headless game at a given tier and platform count,
+    played by a seeded bot. A run that ends is restarted right away so
+    every measured frame has the requested density.
+    """
+
+    def __init__(self, game, tier, maxPlatforms, seed):
+        self.game = game
+        self.tier = tier
+        self.maxPlatforms = maxPlatforms
+        self.seed = seed
+        self.restarts = 0
+
+    def start(self):
+        game = self.game
+        game.maxPlatforms = self.maxPlatforms
+        game.inputSource = RandomInput(self.seed + self.restarts)
+        game.setupGame(self.seed + self.restarts)
+        game.score = tierScores[self.tier]
+        # Populate the initial platforms as if they spawned at this tier,
+        # skipping the full-width base platform under the player.
+        for plat in game.platforms.sprites():
+            if plat.rect.bottom < screenHeight:
+                game.spawnEnemy(plat)
+        game.isPlaying = True
+
+    def step(self):
+        """
+        Runs one frame and returns (update seconds, draw seconds).
+        """
+        game = self.game
+        if not game.isPlaying:
+            self.restarts += 1
+            self.start()
+        begin = time.perf_counter()
+        game.snapshotPositions()
+        game.updateLogic()
+        middle = time.perf_counter()
+        game.drawScene()
+        end = time.perf_counter()
+        return middle - begin, end - middle
+
+
+def runScenario(tier, density, frames, seed, entityStore=False):
+    game = InfernoGame(headless=True)
+    if entityStore:
+        game.entityStore = EntityStore(game)
+    platformCount = max(1, int(maxPlatforms * density))
+
+    # Pass 1: timings, without tracing overhead
+    session = BenchmarkSession(game, tier, platformCount, seed)
+    session.start()
+    updateTimes, drawTimes, frameTimes = [], [], []
+    entityCounts = []
+    for _ in range(frames):
+        updateTime, drawTime = session.step()
+        updateTimes.append(updateTime * 1000)
+        drawTimes.append(drawTime * 1000)
+        frameTimes.append((updateTime + drawTime) * 1000)
+        entityCounts.append(len(game.allSprites))
+
+    # Pass 2: same scripted session again, with memory tracing
+    session = BenchmarkSession(game, tier, platformCount, seed)
+    session.start()
+    allocatedBytes, netBlocks = [], []
+    tracemalloc.start()
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        startCurrent = tracemalloc.get_traced_memory()[0]
+        startBlocks = sys.getallocatedblocks()
+        session.step()
+        netBlocks.append(sys.getallocatedblocks() - startBlocks)
+        peak = tracemalloc.get_traced_memory()[1]
+        allocatedBytes.append(peak - startCurrent)
+    peakTraced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "name": f"tier{tier}_x{density:g}",
+        "tier": tier,
+        "density": density,
+        "maxPlatforms": platformCount,
+        "frames": frames,
+        "restarts": session.restarts,
+        "meanEntities": sum(entityCounts) / len(entityCounts),
+        "updateMs": summarize(updateTimes),
+        "drawMs": summarize(drawTimes),
+        "frameMs": summarize(frameTimes),
+        "allocatedBytesPerFrame": summarize(allocatedBytes),
+        "netBlocksPerFrame": summarize(netBlocks),
+        "peakTracedBytes": peakTraced,
+    }
+
+
+def peakRssKb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def gitCommit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compareResults(current, previous):
+    """
+    Prints the p50/p95 frame time change of every scenario found in both.
+    """
+    old = {s["name"]: s for s in previous["scenarios"]}
+    print(f"{'scenario':<14}{'p50 ms':>16}{'p95 ms':>18}")
+    for scenario in current["scenarios"]:
+        before = old.get(scenario["name"])
+        if before is None:
+            continue
+        cells = []
+        for key in ("p50", "p95"):
+            new = scenario["frameMs"][key]
+            was = before["frameMs"][key]
+            change = (new - was) / was * 100 if was else 0.0
+            cells.append(f"{was:6.2f}->{new:6.2f} {change:+4.0f}%")
+        print(f"{scenario['name']:<14}{cells[0]:>16}  {cells[1]:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--tiers", type=int, nargs="+", default=[0, 1, 2, 3])
+    parser.add_argument("--densities", type=float, nargs="+",
+                        default=[1, 3, 10])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--entity-store", action="store_true",
+                        help="step hazards through the NumPy entity store")
+    args = parser.parse_args()
+
+    scenarios = []
+    for tier in args.tiers:
+        for density in args.densities:
+            result = runScenario(tier, density, args.frames, args.seed,
+                                 args.entity_store)
+            scenarios.append(result)
+            print(f"{result['name']:<14} frame p50 "
+                  f"{result['frameMs']['p50']:6.2f} ms  p95 "
+                  f"{result['frameMs']['p95']:6.2f} ms  p99 "
+                  f"{result['frameMs']['p99']:6.2f} ms")
+
+    results = {
+        "meta": {
+            "commit": gitCommit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "seed": args.seed,
+            "entityStore": args.entity_store,
+            "peakRssKb": peakRssKb(),
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compareResults(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
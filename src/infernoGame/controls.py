@@ -0,0 +1,220 @@
+"""
+Input sources for InfernoGame.
+Every source is polled once per simulation tick and returns a bitmask of
+the actions held during that tick, so the game logic never has to talk to
+the keyboard directly. Live events reach the sources through an
+InputQueue, which hands them over at the next tick. reset() is called
+when a new game starts and drops whatever the last game left held.
+"""
+import random
+from collections import deque
+
+import pygame
+
+# --- Action Bits ---
+INPUT_NONE = 0
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+
+jumpKeys = (pygame.K_SPACE, pygame.K_UP, pygame.K_w)
+moveKeys = {
+    pygame.K_LEFT: INPUT_LEFT, pygame.K_a: INPUT_LEFT,
+    pygame.K_RIGHT: INPUT_RIGHT, pygame.K_d: INPUT_RIGHT,
+}
+# Events that can change what a live input source reports
+queuedEventTypes = (pygame.KEYDOWN, pygame.KEYUP, pygame.WINDOWFOCUSLOST)
+
+
+class InputQueue:
+    """
+    Timestamped events waiting for their simulation tick.
+    The game stamps events when it pumps them, once per frame; the next
+    tick takes every event stamped up to the latest pump, so input is
+    applied as soon as a tick runs, however frames and ticks line up.
+    The stamps also measure input latency.
+    """
+
+    def __init__(self):
+        self.events = deque()
+
+    def push(self, event, stamp):
+        if event.type in queuedEventTypes:
+            self.events.append((stamp, event))
+
+    def due(self, until=None):
+        """
+        Removes and yields (stamp, event) for every event stamped at or
+        before 'until' (perf_counter seconds; None takes them all).
+        """
+        events = self.events
+        while events and (until is None or events[0][0] <= until):
+            yield events.popleft()
+
+    def clear(self):
+        self.events.clear()
+
+
+class KeyboardInput:
+    """
+    Live keyboard input built only from key events, never from the
+    current keyboard state, so every action comes from an event applied
+    at its own tick. A movement key tapped within one tick still moves
+    for that tick; jumps are presses, holding the key does not repeat.
+    """
+
+    def __init__(self):
+        self.held = {}  # key -> action bit
+        self.pressed = INPUT_NONE  # Presses since the last poll
+
+    def handleEvent(self, event):
+        """
+        Returns True when the event changed the input.
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key in jumpKeys:
+                self.pressed |= INPUT_JUMP
+                return True
+            action = moveKeys.get(event.key)
+            if action:
+                self.held[event.key] = action
+                self.pressed |= action
+                return True
+        elif event.type == pygame.KEYUP:
+            return self.held.pop(event.key, None) is not None
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # Key releases are not reported to an unfocused window
+            self.held.clear()
+        return False
+
+    def reset(self):
+        # The game-over screen eats the key releases
+        self.held.clear()
+        self.pressed = INPUT_NONE
+
+    def poll(self):
+        actions = self.pressed
+        for action in self.held.values():
+            actions |= action
+        self.pressed = INPUT_NONE
+        return actions
+
+
+class ScriptedInput:
+    """
+    Plays back a fixed sequence of action bitmasks, one per tick.
+    When the script runs out it either loops or keeps returning no input.
+    """
+
+    def __init__(self, actions, loop=False):
+        self.actions = list(actions)
+        self.loop = loop
+        self.index = 0
+
+    def handleEvent(self, event):
+        pass
+
+    def reset(self):
+        pass
+
+    def poll(self):
+        if not self.actions:
+            return INPUT_NONE
+        if self.index >= len(self.actions):
+            if not self.loop:
+                return INPUT_NONE
+            self.index = 0
+        actions = self.actions[self.index]
+        self.index += 1
+        return actions
+
+
+class ActionInput:
+    """
+    Input set from code: the caller stores the actions for the next tick
+    in 'actions' (agents, training environments).
+    """
+
+    def __init__(self):
+        self.actions = INPUT_NONE
+
+    def handleEvent(self, event):
+        pass
+
+    def reset(self):
+        self.actions = INPUT_NONE
+
+    def poll(self):
+        return self.actions
+
+
+class RandomInput:
+    """
+    Simple bot for balancing runs: holds a direction for a while, changes
+    its mind at random and jumps with a fixed probability per tick.
+    """
+
+    def __init__(self, seed=None, jumpChance=0.08, switchChance=0.03):
+        self.rng = random.Random(seed)
+        self.jumpChance = jumpChance
+        self.switchChance = switchChance
+        self.direction = INPUT_NONE
+
+    def handleEvent(self, event):
+        pass
+
+    def reset(self):
+        pass
+
+    def poll(self):
+        if self.rng.random() < self.switchChance:
+            self.direction = self.rng.choice(
+                (INPUT_NONE, INPUT_LEFT, INPUT_RIGHT)
+            )
+        actions = self.direction
+        if self.rng.random() < self.jumpChance:
+            actions |= INPUT_JUMP
+        return actions
+
+
+class ClimberInput:
+    """
+    Heuristic bot that reads the game state: jumps whenever it stands on
+    something and steers towards the next platform above. It ignores
+    enemies, which is what difficulty tuning wants to measure.
+    'mistakeChance' makes it press a random direction now and then.
+    """
+
+    def __init__(self, game, seed=None, mistakeChance=0.05):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.mistakeChance = mistakeChance
+
+    def handleEvent(self, event):
+        pass
+
+    def reset(self):
+        pass
+
+    def nextPlatform(self):
+        feet = self.game.player.rect.bottom
+        target = None
+        for platform in self.game.platforms:
+            top = platform.rect.top
+            if top < feet - 50 and (target is None or top > target.rect.top):
+                target = platform
+        return target
+
+    def poll(self):
+        player = self.game.player
+        actions = INPUT_JUMP if player.onGround else INPUT_NONE
+        if self.rng.random() < self.mistakeChance:
+            return actions | self.rng.choice((INPUT_LEFT, INPUT_RIGHT))
+        target = self.nextPlatform()
+        if target is not None:
+            offset = target.rect.centerx - player.rect.centerx
+            if offset < -target.rect.width // 4:
+                actions |= INPUT_LEFT
+            elif offset > target.rect.width // 4:
+                actions |= INPUT_RIGHT
+        return actions
@@ -0,0 +1,189 @@
+"""
+Structure-of-arrays entity store for InfernoGame.
+Hazards keep their state (position, speed, direction, platform bounds,
+fire timer) in NumPy arrays and are stepped in vectorized batches instead
+of one update() call per sprite. The sprites stay normal pygame sprites:
+the store copies the new positions back into their rects every tick, so
+collisions, the spatial index and rendering work unchanged.
+
+NumPy is optional; without it the game keeps using per-sprite updates.
+"""
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from settings import screenWidth, tickScale, entityStoreCapacity
+from sprites import Spike, PatrolEnemy, RangedEnemy, Projectile
+
+KIND_SPIKE = 0
+KIND_PATROL = 1
+KIND_RANGED = 2
+KIND_PROJECTILE = 3
+
+entityKinds = {
+    Spike: KIND_SPIKE,
+    PatrolEnemy: KIND_PATROL,
+    RangedEnemy: KIND_RANGED,
+    Projectile: KIND_PROJECTILE,
+}
+
+# name -> dtype of every per-entity column
+entityColumns = {
+    "kind": "int8",
+    "x": "int64",
+    "y": "int64",
+    "width": "int64",
+    "height": "int64",
+    "speed": "float64",
+    "direction": "int64",
+    "remainder": "float64",
+    "platLeft": "int64",
+    "platRight": "int64",
+    "lastShot": "int64",
+    "shootDelay": "int64",
+}
+
+
+def entityStoreAvailable():
+    return numpy is not None
+
+
+class EntityStore(pygame.sprite.Group):
+    """
+    Sprite group that owns the simulation state of its members.
+
+    Row i of every column belongs to self.members[i]; removing a sprite
+    moves the last row into its slot, so the live rows are always
+    0..count-1. Platforms never move, so their bounds are copied in once
+    when an enemy is added.
+    """
+
+    def __init__(self, game, capacity=entityStoreCapacity):
+        self.game = game
+        self.count = 0
+        self.members = []
+        self.rows = {}
+        self.columns = {
+            name: numpy.zeros(capacity, dtype)
+            for name, dtype in entityColumns.items()
+        }
+        super().__init__()
+
+    def grow(self):
+        for name, column in self.columns.items():
+            self.columns[name] = numpy.concatenate(
+                (column, numpy.zeros_like(column))
+            )
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if self.count == len(self.columns["kind"]):
+            self.grow()
+        row = self.count
+        self.count += 1
+        self.members.append(sprite)
+        self.rows[sprite] = row
+
+        c = self.columns
+        kind = entityKinds[type(sprite)]
+        c["kind"][row] = kind
+        c["x"][row], c["y"][row] = sprite.rect.topleft
+        c["width"][row], c["height"][row] = sprite.rect.size
+        c["remainder"][row] = getattr(sprite, "remainder", 0.0)
+        c["speed"][row] = getattr(sprite, "speed", 0)
+        c["direction"][row] = getattr(sprite, "direction", 1)
+        if kind == KIND_RANGED:
+            c["lastShot"][row] = sprite.lastShot
+            c["shootDelay"][row] = sprite.shootDelay
+        if kind != KIND_PROJECTILE:
+            platRect = sprite.platform.rect
+            c["platLeft"][row] = platRect.left
+            c["platRight"][row] = platRect.right
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        row = self.rows.pop(sprite)
+        c = self.columns
+
+        # Hand the state back, so the sprite object is never stale
+        if hasattr(sprite, "remainder"):
+            sprite.remainder = float(c["remainder"][row])
+        if isinstance(sprite, PatrolEnemy):
+            sprite.direction = int(c["direction"][row])
+        elif isinstance(sprite, RangedEnemy):
+            sprite.lastShot = int(c["lastShot"][row])
+
+        last = self.count - 1
+        if row != last:
+            for column in c.values():
+                column[row] = column[last]
+            moved = self.members[last]
+            self.members[row] = moved
+            self.rows[moved] = row
+        self.members.pop()
+        self.count = last
+
+    def update(self, band):
+        """
+        One simulation tick for every member overlapping the 'band' rect,
+        matching the per-sprite update() methods of the hazard classes.
+        The rest sleep. Returns how many members were awake.
+        """
+        n = self.count
+        if n == 0:
+            return 0
+        c = self.columns
+        kind = c["kind"][:n]
+        x = c["x"][:n]
+        y = c["y"][:n]
+        width = c["width"][:n]
+        direction = c["direction"][:n]
+        remainder = c["remainder"][:n]
+        awake = (
+            (y < band.bottom) & (y + c["height"][:n] > band.top) &
+            (x < band.right) & (x + width > band.left)
+        )
+        oldX = x.copy()
+
+        # Horizontal motion with sub-pixel carry (see step_pixels)
+        total = c["speed"][:n] * direction * tickScale + remainder
+        step = numpy.rint(total)
+        remainder[awake] = (total - step)[awake]
+        x[awake] += step.astype(numpy.int64)[awake]
+
+        # Patrols turn around at the platform edges
+        patrol = awake & (kind == KIND_PATROL)
+        direction[patrol & (x + width > c["platRight"][:n])] = -1
+        direction[patrol & (x < c["platLeft"][:n])] = 1
+
+        # Only moved sprites need their rect touched: nothing moves
+        # vertically, and spikes and ranged enemies not at all.
+        members = self.members
+        moved = numpy.flatnonzero(x != oldX)
+        for i, newX in zip(moved.tolist(), x[moved].tolist()):
+            members[i].rect.x = newX
+
+        # Collect the sprites to fire and to cull before touching the
+        # store, since both add and remove rows. Enemies on platforms are
+        # culled with their platform.
+        ticks = self.game.ticks
+        lastShot = c["lastShot"][:n]
+        firing = awake & (kind == KIND_RANGED) & (
+            ticks - lastShot > c["shootDelay"][:n]
+        )
+        lastShot[firing] = ticks
+        offScreen = awake & (kind == KIND_PROJECTILE) & (
+            (x + width < 0) | (x > screenWidth) |
+            (y > self.game.cameraBottom())
+        )
+        shooters = [members[i] for i in numpy.flatnonzero(firing).tolist()]
+        culled = [members[i] for i in numpy.flatnonzero(offScreen).tolist()]
+
+        for sprite in shooters:
+            sprite.shoot()
+        for sprite in culled:
+            sprite.kill()
+        return int(numpy.count_nonzero(awake))
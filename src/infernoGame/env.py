@@ -0,0 +1,217 @@
+"""
+Gym-style training interface for InfernoGame.
+InfernoEnv wraps one headless game behind reset()/step(action); VectorEnv
+steps many of them in lockstep and returns batched NumPy arrays. Neither
+renders nor reads pygame events, so throughput is bound by the
+simulation itself.
+
+Actions are the per-tick input bitmask (0-7, see controls.py).
+Observations are float32 vectors, positions relative to the player and
+scaled by the screen size:
+    player    x, y, velocityX, velocityY, onGround, distance to the lava
+    platforms (nearest first by height) present, dx, dy, width
+    hazards   (nearest first, within envHazardRange vertically) kind,
+              dx, dy
+Reward is the score gained during the step, minus envDeathPenalty when
+the run ends.
+
+Needs numpy, unlike the game itself.
+"""
+import random
+
+try:
+    import numpy
+except ImportError:
+    raise ImportError(
+        "env.py needs numpy for its observation arrays: pip install numpy"
+    ) from None
+import pygame
+
+from settings import *
+from controls import ActionInput
+from main import InfernoGame
+
+actionCount = 8
+hazardCodes = {"spike": 1, "patrol": 2, "ranged": 3, "projectile": 4}
+playerFeatures = 6
+platformFeatures = 4
+hazardFeatures = 3
+platformEnd = playerFeatures + envPlatformSlots * platformFeatures
+observationSize = platformEnd + envHazardSlots * hazardFeatures
+# Copied over the unused slots of an observation
+emptyObservation = memoryview(numpy.zeros(observationSize, numpy.float32))
+
+
+class InfernoEnv:
+    """
+    One headless game driven through reset() and step().
+
+    reset() returns (observation, info); step() returns (observation,
+    reward, terminated, truncated, info). A run is truncated after
+    'maxTicks' ticks. Without an explicit seed, reset() draws the next
+    one from a stream seeded with 'seed', so a sequence of episodes is
+    reproducible.
+    """
+
+    def __init__(self, seed=None, maxTicks=headlessMaxTicks,
+                 frameSkip=envFrameSkip, assetSource=None):
+        self.controls = ActionInput()
+        self.game = InfernoGame(
+            headless=True, inputSource=self.controls,
+            assetSource=assetSource
+        )
+        self.seeds = random.Random(seed)
+        self.maxTicks = maxTicks
+        self.frameSkip = frameSkip
+        self.observation = numpy.zeros(observationSize, numpy.float32)
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.seeds.getrandbits(32)
+        self.game.setupGame(seed)
+        self.game.isPlaying = True
+        return self.observe(), self.info()
+
+    def step(self, action):
+        reward, terminated, truncated = self.advance(action)
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def advance(self, action):
+        """
+        Plays one step without building the observation.
+        Returns (reward, terminated, truncated).
+        """
+        game = self.game
+        self.controls.actions = int(action)
+        startScore = game.score
+        for _ in range(self.frameSkip):
+            game.updateLogic()
+            if not game.isPlaying:
+                break
+        terminated = not game.isPlaying
+        truncated = not terminated and game.ticks >= self.maxTicks
+        reward = float(game.score - startScore)
+        if terminated:
+            reward -= envDeathPenalty
+        return reward, terminated, truncated
+
+    def info(self):
+        game = self.game
+        return {
+            "seed": game.seed,
+            "score": int(game.score),
+            "ticks": game.ticks,
+            "deathCause": game.deathCause,
+        }
+
+    def observe(self, out=None):
+        """
+        Writes the observation into 'out' (or an internal buffer, which
+        the next call overwrites) and returns it.
+        """
+        if out is None:
+            out = self.observation
+        # Single items are much cheaper to set through a memoryview
+        values = memoryview(out)
+        game = self.game
+        player = game.player
+        rect = player.rect
+        px, py, feet = rect.centerx, rect.centery, rect.bottom
+        values[0] = px / screenWidth
+        values[1] = (py + game.scrollOffset) / screenHeight
+        values[2] = player.velocityX / playerSpeed
+        values[3] = player.velocityY / -jumpStrength
+        values[4] = 1.0 if player.onGround else 0.0
+        values[5] = (
+            game.lava.rect.top + lavaCrestHeight - feet
+        ) / screenHeight
+
+        index = playerFeatures
+        platforms = sorted([
+            (abs(plat.rect.top - feet), plat.rect)
+            for plat in game.platforms.sprites()
+        ])[:envPlatformSlots]
+        for _, platRect in platforms:
+            values[index] = 1.0
+            values[index + 1] = (platRect.centerx - px) / screenWidth
+            values[index + 2] = (platRect.top - feet) / screenHeight
+            values[index + 3] = platRect.width / screenWidth
+            index += platformFeatures
+        values[index:platformEnd] = emptyObservation[index:platformEnd]
+
+        # Only hazards near the player are candidates, the index finds them
+        index = platformEnd
+        if game.hazards:
+            band = pygame.Rect(
+                -screenWidth, py - envHazardRange,
+                screenWidth * 3, envHazardRange * 2
+            )
+            hazards = sorted([
+                (
+                    (hazard.rect.centerx - px) ** 2 +
+                    (hazard.rect.centery - py) ** 2,
+                    hazardCodes[hazard.hazardName], hazard.rect
+                )
+                for hazard in game.hazards.query(band)
+            ])[:envHazardSlots]
+            for _, code, hazardRect in hazards:
+                values[index] = code / len(hazardCodes)
+                values[index + 1] = (hazardRect.centerx - px) / screenWidth
+                values[index + 2] = (hazardRect.centery - py) / screenHeight
+                index += hazardFeatures
+        values[index:] = emptyObservation[index:]
+        return out
+
+
+class VectorEnv:
+    """
+    'count' environments stepped together in one process. Images are
+    loaded once and shared. Finished environments reset themselves; the
+    last observation of the finished run is in info["finalObservation"].
+    """
+
+    def __init__(self, count, seed=None, maxTicks=headlessMaxTicks,
+                 frameSkip=envFrameSkip):
+        seeds = random.Random(seed)
+        self.envs = []
+        for _ in range(count):
+            source = self.envs[0].game if self.envs else None
+            self.envs.append(InfernoEnv(
+                seeds.getrandbits(32), maxTicks, frameSkip, source
+            ))
+        self.observations = numpy.zeros(
+            (count, observationSize), numpy.float32
+        )
+        self.rewards = numpy.zeros(count, numpy.float32)
+        self.terminated = numpy.zeros(count, bool)
+        self.truncated = numpy.zeros(count, bool)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self, seeds=None):
+        infos = []
+        for index, env in enumerate(self.envs):
+            env.reset(None if seeds is None else seeds[index])
+            env.observe(self.observations[index])
+            infos.append(env.info())
+        return self.observations.copy(), infos
+
+    def step(self, actions):
+        infos = []
+        observations = self.observations
+        for index, env in enumerate(self.envs):
+            reward, terminated, truncated = env.advance(actions[index])
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            info = env.info()
+            if terminated or truncated:
+                info["finalObservation"] = env.observe().copy()
+                env.reset()
+            env.observe(observations[index])
+            infos.append(info)
+        return (
+            self.observations.copy(), self.rewards.copy(),
+            self.terminated.copy(), self.truncated.copy(), infos
+        )
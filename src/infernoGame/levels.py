@@ -0,0 +1,168 @@
+"""
+Lookahead level generation for InfernoGame.
+Platforms are planned in chunks ahead of the camera, from their own random
+stream, so the main loop only pops ready plans when it needs a platform.
+Chunks are built in the idle time left at the end of a frame; a plan that
+is needed before it was prepared is built on the spot, which gives the
+same level either way.
+"""
+import functools
+import time
+from collections import deque, namedtuple
+
+from settings import *
+
+# One future platform. x and width in pixels, y in world coordinates
+# (screen y before any scrolling), roll decides the enemy when it spawns.
+PlatformPlan = namedtuple("PlatformPlan", "x y width roll")
+
+# A standing player's feet are this far below the platform top, and a
+# falling player lands while the feet are between the top and the
+# platform's centre (see InfernoGame.updateLogic)
+standingDepth = 35
+landingDepth = platformHeight // 2
+
+
+@functools.lru_cache(maxsize=None)
+def jumpAirTicks(gap):
+    """
+    Ticks a full jump takes to land on a platform whose top is 'gap'
+    pixels above the one jumped from, or None when it cannot be reached.
+    Steps the player physics the way Player.update() does.
+    """
+    feet = standingDepth
+    velocity = jumpStrength
+    ticks = 0
+    while True:
+        ticks += 1
+        velocity = min(velocity + gravityValue * tickScale, terminalVelocity)
+        feet += velocity * tickScale
+        if velocity > 0:
+            if -gap < feet < -gap + landingDepth:
+                return ticks
+            if feet >= -gap + landingDepth:
+                return None
+
+
+def horizontalGap(left, width, otherLeft, otherWidth):
+    """
+    Edge-to-edge distance between two platform spans, the shorter way
+    round: the player wraps from one side of the screen to the other.
+    """
+    if otherLeft < left:
+        left, width, otherLeft, otherWidth = (
+            otherLeft, otherWidth, left, width
+        )
+    direct = otherLeft - (left + width)
+    wrapped = left + screenWidth - (otherLeft + otherWidth)
+    return max(0, min(direct, wrapped))
+
+
+def checkReachable(previousX, previousWidth, previousY, plan):
+    """
+    Returns why 'plan' cannot be reached from the previous platform
+    (centre x, width, world y), or None when the jump is possible.
+    The reach is how far the player runs at full speed during the
+    jump's time in the air.
+    """
+    gap = previousY - plan.y
+    if not platformMinYGap <= gap < platformMaxYGap:
+        return "vertical gap"
+    airTicks = jumpAirTicks(gap)
+    if airTicks is None:
+        return "too high"
+    if plan.x < 0 or plan.x + plan.width > screenWidth:
+        return "off screen"
+    distance = horizontalGap(
+        previousX - previousWidth / 2, previousWidth, plan.x, plan.width
+    )
+    if distance > playerSpeed * tickScale * airTicks:
+        return "too far"
+    return None
+
+
+class LevelGenerator:
+    """
+    Plans platforms chunk by chunk and keeps 'lookahead' plans queued.
+    """
+
+    def __init__(self, rng, startX, startY, startWidth):
+        self.rng = rng
+        self.lastX = startX
+        self.lastY = startY
+        self.lastWidth = startWidth
+        self.queue = deque()
+        self.chunks = 0
+        self.rejected = 0
+        self.stalls = 0
+
+    def planPlatform(self):
+        """
+        Rolls one candidate platform above the last planned one.
+        """
+        rng = self.rng
+        lastX = self.lastX
+        minX = max(0, lastX - maxJumpDistance)
+        maxX = min(screenWidth - platformMaxW, lastX + maxJumpDistance)
+        width = rng.randrange(platformMinW, platformMaxW)
+
+        if maxX + width > screenWidth:
+            maxX = screenWidth - width
+        if minX > maxX:
+            minX = max(0, screenWidth // 2 - maxJumpDistance)
+            maxX = min(screenWidth - width, screenWidth // 2 + maxJumpDistance)
+
+        x = rng.randint(int(minX), int(maxX))
+        y = self.lastY - rng.randrange(platformMinYGap, platformMaxYGap)
+        return PlatformPlan(x, y, width, rng.random())
+
+    def buildChunk(self):
+        """
+        Appends levelChunkSize validated plans to the queue. A candidate
+        that cannot be reached is rolled again; after levelMaxRetries the
+        platform is placed straight above the previous one.
+        """
+        for _ in range(levelChunkSize):
+            for _ in range(levelMaxRetries):
+                plan = self.planPlatform()
+                reason = checkReachable(
+                    self.lastX, self.lastWidth, self.lastY, plan
+                )
+                if reason is None:
+                    break
+                self.rejected += 1
+            else:
+                x = int(self.lastX - plan.width // 2)
+                x = max(0, min(x, screenWidth - plan.width))
+                plan = plan._replace(x=x, y=self.lastY - platformMinYGap)
+            self.queue.append(plan)
+            self.lastX = plan.x + plan.width / 2
+            self.lastY = plan.y
+            self.lastWidth = plan.width
+        self.chunks += 1
+
+    def prefill(self, deadline):
+        """
+        Uses the time until 'deadline' (perf_counter seconds) to build
+        chunks until levelLookahead plans are ready.
+        """
+        while (len(self.queue) < levelLookahead and
+               time.perf_counter() < deadline):
+            self.buildChunk()
+
+    def next(self):
+        """
+        Pops the next plan, building a chunk right away if none is ready.
+        """
+        if not self.queue:
+            self.stalls += 1
+            self.buildChunk()
+        return self.queue.popleft()
+
+    def stats(self):
+        return {
+            "queued": len(self.queue),
+            "chunks": self.chunks,
+            "rejected": self.rejected,
+            "stalls": self.stalls,
+        }
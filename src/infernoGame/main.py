@@ -1,13 +1,38 @@
 import sys
-import json
+import argparse
+import bisect
+import sqlite3
 import os
 import random
+import time
 import pygame
 
 from settings import *
 from sprites import (
-    Player, Platform, Lava, Spike, PatrolEnemy, RangedEnemy
+    Player, Platform, Lava, Spike, PatrolEnemy, RangedEnemy, Projectile
 )
+from controls import KeyboardInput, InputQueue, INPUT_JUMP
+from prototypes import PrototypeCache
+from assetcache import AssetCache
+from backgrounds import BackgroundManager
+from textcache import TextRenderer
+from rendering import FullRenderer, DirtyRenderer
+from spatial import SpatialGroup
+from pooling import SpritePool
+from replays import Replay
+from scores import ScoreStore
+from profiler import FrameProfiler, NullProfiler
+from presets import loadPreset
+from entities import EntityStore, entityStoreAvailable
+from particles import ParticleSystem, NullParticles, particlesAvailable
+from levels import LevelGenerator
+
+
+# Names used in spawnChances
+enemyClasses = {
+    enemyClass.hazardName: enemyClass
+    for enemyClass in (Spike, PatrolEnemy, RangedEnemy)
+}
 
 
 class InfernoGame:
@@ -15,30 +40,134 @@ class InfernoGame:
     Main game engine class. Manages the loop, rendering, events, and scoring.
     """
 
-    def __init__(self):
+    def __init__(self, headless=False, inputSource=None, assetSource=None,
+                 preset=None):
         """
         Initialize pygame, display, and game objects.
+        In headless mode the SDL dummy video driver is used, so no window
+        is opened and the simulation can run on machines without a display.
+        'assetSource' is another InfernoGame whose loaded images are shared
+        instead of loading a copy (many headless games in one process).
+        'preset' holds the performance values (see presets.py); without it
+        they are loaded from the environment and performance.json, and
+        headless games use the default preset.
         """
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        if preset is None:
+            preset = (
+                performancePresets[defaultPreset] if headless
+                else loadPreset()
+            )
+        self.applyPreset(preset)
         pygame.init()
-        self.screen = pygame.display.set_mode((screenWidth, screenHeight))
+        self.screen = self.createScreen()
         pygame.display.set_caption("InfernoGame - Escape the Depths")
         self.clock = pygame.time.Clock()
         self.isRunning = True
         self.fontName = pygame.font.match_font(fontName)
+        self.textRenderer = TextRenderer(self.fontName)
+
+        # Per-subsystem frame timings, shown with F3 (not kept headless)
+        if headless:
+            self.profiler = NullProfiler()
+        else:
+            self.profiler = FrameProfiler(
+                targetFrameRate=self.frameRate,
+                keepRecords=bool(profilerExportFormat)
+            )
+
+        # Cosmetic effects; nothing to draw them for headless
+        if headless or not self.particleBudget or not particlesAvailable():
+            self.particles = NullParticles()
+        else:
+            self.particles = ParticleSystem(self, self.particleBudget)
 
-        # Load visual assets (images)
-        self.loadAssets()
+        # Where the player's actions come from (keyboard, script, bot...)
+        self.inputSource = inputSource or KeyboardInput()
+        # Pumped events wait here for the next tick
+        self.inputQueue = InputQueue()
+        # Time of the latest event pump; None lets ticks take every event
+        self.inputTime = None
+
+        if assetSource is not None:
+            self.shareAssets(assetSource)
+        else:
+            # Load visual assets (images)
+            self.assetCache = AssetCache() if useAssetCache else None
+            self.loadAssets()
+            # Scaled images and masks shared by every sprite of the same kind
+            self.prototypes = PrototypeCache(self.assetCache)
+            self.setupBackgrounds()
 
         # Game state variables
+        self.maxPlatforms = maxPlatforms
+        # Balance knobs, kept on the instance so tuning runs can vary them
+        self.difficultyTiers = (
+            difficultyTier1, difficultyTier2, difficultyTier3
+        )
+        self.spawnChances = spawnChances
+        self.lavaRiseSpeed = lavaRiseSpeed
         self.score = 0
+        self.ticks = 0
+        # Camera: sprites keep world coordinates, screen y = y + scrollOffset
+        self.scrollOffset = 0
         self.playerName = ""
+        # Runs are stored off the UI thread; headless runs are not recorded
+        self.scoreStore = None if headless else ScoreStore()
         self.highScores = self.loadHighScores()
 
         # Initialize sprite groups containers
-        # Use LayeredUpdates to respect drawing order (z-index)
-        self.allSprites = pygame.sprite.LayeredUpdates()
-        self.platforms = pygame.sprite.Group()
-        self.hazards = pygame.sprite.Group()  # Lava, Spikes, Enemies
+        # Layered groups respect drawing order (z-index); the renderer
+        # decides between LayeredUpdates and LayeredDirty.
+        if useDirtyRendering and self.renderScale == 1:
+            self.renderer = DirtyRenderer(self)
+        else:
+            self.renderer = FullRenderer(self)
+        self.allSprites = self.renderer.createGroup()
+        # Recycled sprites, so spawning does not allocate during long runs
+        self.pools = {
+            spriteClass: SpritePool(spriteClass, spritePoolCapacity)
+            for spriteClass in (
+                Platform, Spike, PatrolEnemy, RangedEnemy, Projectile
+            )
+        }
+
+        # Platforms and hazards keep a vertical index for broad-phase checks
+        self.platforms = SpatialGroup()
+        self.hazards = SpatialGroup()  # Spikes, Enemies
+
+        # Optional vectorized stepping of the hazards
+        if useEntityStore and entityStoreAvailable():
+            self.entityStore = EntityStore(self)
+        else:
+            self.entityStore = None
+
+    def applyPreset(self, preset):
+        """
+        Takes over the performance values of 'preset' (see presets.py).
+        """
+        self.presetName = preset.get("name", defaultPreset)
+        self.renderScale = preset["renderScale"]
+        self.lavaBlending = preset["lavaBlending"]
+        self.drawBackground = preset["drawBackground"]
+        self.frameRate = preset["frameRate"]
+        self.particleBudget = preset["particleBudget"]
+
+    def createScreen(self):
+        """
+        Opens the window. Below full render resolution the game draws
+        into a smaller screen that SDL scales up to the window.
+        """
+        if self.renderScale == 1:
+            return pygame.display.set_mode((screenWidth, screenHeight))
+        size = (
+            round(screenWidth * self.renderScale),
+            round(screenHeight * self.renderScale)
+        )
+        return pygame.display.set_mode(size, pygame.SCALED)
 
     def loadAssets(self):
         """
@@ -49,10 +178,15 @@ class InfernoGame:
         self.bgStartImg = self.loadImage(bgStartImage)
         self.bgGameImg = self.loadImage(bgGameImage)
         self.bgGameOverImg = self.loadImage(bgGameOverImage)
+        self.bgParallaxImgs = []
+        for layerPath, factor in bgParallaxLayers:
+            layerImg = self.loadImage(layerPath)
+            if layerImg:
+                self.bgParallaxImgs.append((layerImg, factor))
 
         # Main entities
-        self.playerImg = self.loadImage(playerImage)
-        self.playerJumpImg = self.loadImage(playerJumpImage)
+        self.playerWalkImgs = self.loadImageStrip(playerWalkImages)
+        self.playerJumpImgs = self.loadImageStrip(playerJumpImages)
         self.platformImg = self.loadImage(platformImage)
         self.lavaImg = self.loadImage(lavaImage)
 
@@ -65,7 +199,47 @@ class InfernoGame:
         if not os.path.exists(assetsFolder):
             print(f"Warning: The folder '{assetsFolder}' was not found.")
 
+    def shareAssets(self, other):
+        """
+        Reuses the images, prototypes and backgrounds loaded by 'other'.
+        """
+        for name, value in vars(other).items():
+            if name.endswith(("Img", "Imgs")):
+                setattr(self, name, value)
+        self.assetCache = other.assetCache
+        self.prototypes = other.prototypes
+        self.backgrounds = other.backgrounds
+
+    def saveAssetCache(self):
+        """
+        Writes images built since launch to the on-disk asset cache.
+        """
+        if self.assetCache is None:
+            return
+        try:
+            self.assetCache.save()
+        except IOError:
+            print("Error saving asset cache.")
+
+    def setupBackgrounds(self):
+        """
+        Registers the background of every screen. Scaling to the screen
+        size happens once, the first time each background is drawn.
+        """
+        self.backgrounds = BackgroundManager()
+        self.backgrounds.add("start", self.bgStartImg)
+        self.backgrounds.add("game", self.bgGameImg, self.bgParallaxImgs)
+        self.backgrounds.add(
+            "gameOver", self.bgGameOverImg or self.bgGameImg
+        )
+
     def loadImage(self, filePath):
+        if self.assetCache is not None:
+            try:
+                return self.assetCache.loadImage(filePath)
+            except pygame.error as e:
+                print(f"Error loading image: {filePath} - {e}")
+                return None
         if os.path.exists(filePath):
             try:
                 img = pygame.image.load(filePath).convert_alpha()
@@ -74,34 +248,76 @@ class InfernoGame:
                 print(f"Error loading image: {filePath} - {e}")
         return None
 
+    def loadImageStrip(self, filePaths):
+        """
+        Loads a list of animation frames, skipping the missing ones.
+        """
+        frames = []
+        for filePath in filePaths:
+            img = self.loadImage(filePath)
+            if img:
+                frames.append(img)
+        return frames
+
     def loadHighScores(self):
-        if not os.path.exists(highScoreFile):
+        if self.scoreStore is None:
             return []
         try:
-            with open(highScoreFile, 'r') as f:
-                return json.load(f)
-        except (ValueError, IOError):
+            return self.scoreStore.topScores(leaderboardSize)
+        except sqlite3.Error as e:
+            print(f"Error loading high scores: {e}")
             return []
 
     def saveHighScore(self):
         nameToSave = (
             self.playerName if self.playerName.strip() else "Anonymous"
         )
-        newEntry = {"name": nameToSave, "score": int(self.score)}
-        self.highScores.append(newEntry)
-        self.highScores.sort(key=lambda x: x["score"], reverse=True)
-        self.highScores = self.highScores[:5]
-        try:
-            with open(highScoreFile, 'w') as f:
-                json.dump(self.highScores, f)
-        except IOError:
-            print("Error saving high scores.")
-
-    def setupGame(self):
+        newEntry = {
+            "name": nameToSave, "score": int(self.score),
+            "seed": self.seed, "ticks": self.ticks, "replay": None,
+            "createdAt": time.time()
+        }
+        # Every run is stored; the cached leaderboard is updated here so
+        # the start screen does not wait for the database.
+        leaderboard = self.highScores + [newEntry]
+        leaderboard.sort(key=lambda x: x["score"], reverse=True)
+        self.highScores = leaderboard[:leaderboardSize]
+        replay = None
+        if any(entry is newEntry for entry in self.highScores):
+            newEntry["replay"] = f"run_{self.seed:08x}_{self.ticks}.ifr"
+            replay = Replay.fromGame(self, nameToSave)
+        self.scoreStore.record(dict(newEntry), replay)
+
+    def setupGame(self, seed=None):
+        """
+        Starts a new run. The seed drives every random choice of the run,
+        so the same seed and inputs always replay the same game.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.inputLog = bytearray()
         self.score = 0
+        self.ticks = 0
+        self.scrollOffset = 0
+        self.deathCause = None
+        self.awakeCount = 0
+        self.sleepingCount = 0
+        self.previousPositions = {}
+        self.previousScrollOffset = 0
+        self.inputQueue.clear()
+        self.inputSource.reset()
+        self.inputTime = None
+        self.particles.reset(seed)
+        self.renderer.reset()
         self.allSprites.empty()
         self.platforms.empty()
         self.hazards.empty()
+        if self.entityStore is not None:
+            self.entityStore.empty()
+        for pool in self.pools.values():
+            pool.releaseAll()
 
         # Pass 'self' to sprites so they can access loaded assets
         self.player = Player(self)
@@ -110,94 +326,78 @@ class InfernoGame:
         # Base platform - FIXED SIZE AND POSITION
         # Updated to use platformHeight (80)
         baseY = screenHeight - platformHeight
-        basePlatform = Platform(self, 0, baseY, screenWidth, platformHeight)
+        basePlatform = self.pools[Platform].acquire(
+            self, 0, baseY, screenWidth, platformHeight
+        )
         self.allSprites.add(basePlatform)
         self.platforms.add(basePlatform)
 
+        # The level layout has its own random stream, so planning ahead in
+        # idle time never changes what the game rng produces.
+        self.levelGenerator = LevelGenerator(
+            random.Random(self.rng.getrandbits(32)),
+            basePlatform.rect.centerx, baseY, screenWidth
+        )
+
         self.lava = Lava(self)
         self.allSprites.add(self.lava)
-        self.hazards.add(self.lava)
 
-        for i in range(maxPlatforms):
+        for i in range(self.maxPlatforms):
             self.spawnPlatform()
 
     def spawnPlatform(self):
         """
-        Platform generation + Difficulty Scaling for Enemies
+        Places the next planned platform + Difficulty Scaling for Enemies
         """
-        if len(self.platforms) == 0:
-            lastX = screenWidth // 2
-            lastY = screenHeight
-        else:
-            lastPlatform = min(self.platforms, key=lambda p: p.rect.y)
-            lastX = lastPlatform.rect.centerx
-            lastY = lastPlatform.rect.y
-
-        minX = max(0, lastX - maxJumpDistance)
-        maxX = min(screenWidth - platformMaxW, lastX + maxJumpDistance)
-        width = random.randrange(platformMinW, platformMaxW)
-
-        if maxX + width > screenWidth:
-            maxX = screenWidth - width
-        if minX > maxX:
-            minX = max(0, screenWidth // 2 - maxJumpDistance)
-            maxX = min(screenWidth - width, screenWidth // 2 + maxJumpDistance)
-
-        x = random.randint(int(minX), int(maxX))
-        y = lastY - random.randrange(platformMinYGap, platformMaxYGap)
-
-        newPlatform = Platform(self, x, y, width, platformHeight)
+        plan = self.levelGenerator.next()
+        newPlatform = self.pools[Platform].acquire(
+            self, plan.x, plan.y, plan.width, platformHeight
+        )
+        self.forgetPosition(newPlatform)
         self.allSprites.add(newPlatform)
         self.platforms.add(newPlatform)
 
         # --- DIFFICULTY & ENEMY SPAWNING ---
-        self.spawnEnemy(newPlatform)
+        self.spawnEnemy(newPlatform, plan.roll)
+
+    def addHazard(self, sprite):
+        """
+        Registers a spike, enemy or projectile with the groups it lives in.
+        """
+        self.forgetPosition(sprite)
+        self.allSprites.add(sprite)
+        self.hazards.add(sprite)
+        if self.entityStore is not None:
+            self.entityStore.add(sprite)
+
+    def difficultyTier(self):
+        """
+        0 below difficultyTier1, then 1 to 3 as the score passes each tier.
+        """
+        return bisect.bisect_right(self.difficultyTiers, self.score)
 
-    def spawnEnemy(self, platform):
+    def spawnEnemy(self, platform, roll=None):
         """
         Decides if an enemy spawns on the platform based on current Score.
         """
-        roll = random.random()  # 0.0 to 1.0
-
-        # Phase 1: Spikes Only
-        if difficultyTier1 <= self.score < difficultyTier2:
-            if roll < 0.5:
-                spike = Spike(self, platform)
-                self.allSprites.add(spike)
-                self.hazards.add(spike)
-
-        # Phase 2: Spikes + Patrol
-        elif difficultyTier2 <= self.score < difficultyTier3:
-            if roll < 0.3:
-                spike = Spike(self, platform)
-                self.allSprites.add(spike)
-                self.hazards.add(spike)
-            elif roll < 0.6:
-                patrol = PatrolEnemy(self, platform)
-                self.allSprites.add(patrol)
-                self.hazards.add(patrol)
-
-        # Phase 3: Total Chaos
-        elif self.score >= difficultyTier3:
-            if roll < 0.2:
-                spike = Spike(self, platform)
-                self.allSprites.add(spike)
-                self.hazards.add(spike)
-            elif roll < 0.5:
-                patrol = PatrolEnemy(self, platform)
-                self.allSprites.add(patrol)
-                self.hazards.add(patrol)
-            elif roll < 0.8:
-                ranged = RangedEnemy(self, platform)
-                self.allSprites.add(ranged)
-                self.hazards.add(ranged)
+        if roll is None:
+            roll = self.rng.random()  # 0.0 to 1.0
+
+        threshold = 0.0
+        for name, chance in self.spawnChances[self.difficultyTier()].items():
+            threshold += chance
+            if roll < threshold:
+                enemyClass = enemyClasses[name]
+                self.addHazard(self.pools[enemyClass].acquire(self, platform))
+                break
 
     def drawText(self, text, size, color, x, y, align="center"):
-        try:
-            font = pygame.font.Font(self.fontName, size)
-        except TypeError:
-            font = pygame.font.SysFont(fontName, size)
-        textSurface = font.render(str(text), True, color)
+        # Layout is in screen coordinates, scaled to the render resolution
+        scale = self.renderScale
+        textSurface = self.textRenderer.render(
+            str(text), max(1, round(size * scale)), color
+        )
+        x, y = round(x * scale), round(y * scale)
         textRect = textSurface.get_rect()
         if align == "center":
             textRect.midtop = (x, y)
@@ -206,67 +406,27 @@ class InfernoGame:
         elif align == "right":
             textRect.topright = (x, y)
         self.screen.blit(textSurface, textRect)
+        return textRect
 
     def showStartScreen(self):
         waiting = True
         self.playerName = ""
+        shownState = None
         while waiting:
-            self.clock.tick(frameRate)
-            if self.bgStartImg:
-                scaledBg = pygame.transform.scale(
-                    self.bgStartImg, (screenWidth, screenHeight)
-                )
-                self.screen.blit(scaledBg, (0, 0))
-            else:
-                self.screen.fill(colorBlack)
-
-            self.drawText(
-                "InfernoGame", fontSizeTitle, colorLava, screenWidth / 2, 100
-            )
-            self.drawText(
-                "Escape the Depths", fontSizeSubtitle,
-                colorWhite, screenWidth / 2, 200
-            )
-            self.drawText(
-                "TOP PLAYERS", fontSizeText, colorAccent, screenWidth / 2, 320
-            )
-
-            yPos = 380
-            if not self.highScores:
-                self.drawText(
-                    "No scores yet!", fontSizeText,
-                    colorSecondaryText, screenWidth / 2, yPos
-                )
-            else:
-                for idx, entry in enumerate(self.highScores):
-                    scoreText = (f"{idx + 1}. "
-                                 f"{entry['name']} - {entry['score']}")
-                    self.drawText(
-                        scoreText, fontSizeText,
-                        colorWhite, screenWidth / 2, yPos
-                    )
-                    yPos += 40
-
-            inputY = screenHeight - 300
-            self.drawText(
-                "ENTER YOUR NAME:", fontSizeSubtitle,
-                colorPlatform, screenWidth / 2, inputY
-            )
+            self.clock.tick(self.frameRate)
+            # Only redraw when the name or the blinking cursor changed
             cursor = "|" if (pygame.time.get_ticks() // 500) % 2 == 0 else ""
-            self.drawText(
-                self.playerName + cursor, fontSizeSubtitle,
-                colorWhite, screenWidth / 2, inputY + 60
-            )
-            self.drawText(
-                "WASD / Arrows to move, SPACE to jump", fontSizeText,
-                colorSecondaryText, screenWidth / 2, screenHeight - 100
-            )
-            pygame.display.flip()
+            if (self.playerName, cursor) != shownState:
+                shownState = (self.playerName, cursor)
+                self.drawStartScreen(cursor)
+                pygame.display.flip()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     waiting = False
                     self.isRunning = False
+                if event.type == pygame.WINDOWEXPOSED:
+                    shownState = None
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:
                         if len(self.playerName) > 0:
@@ -278,47 +438,92 @@ class InfernoGame:
                         if len(self.playerName) < 15 and isPrintable:
                             self.playerName += event.unicode
 
+    def drawStartScreen(self, cursor):
+        """
+        Draws the title, leaderboard and name prompt.
+        """
+        self.backgrounds.draw(self.screen, "start")
+
+        self.drawText(
+            "InfernoGame", fontSizeTitle, colorLava, screenWidth / 2, 100
+        )
+        self.drawText(
+            "Escape the Depths", fontSizeSubtitle,
+            colorWhite, screenWidth / 2, 200
+        )
+        self.drawText(
+            "TOP PLAYERS", fontSizeText, colorAccent, screenWidth / 2, 320
+        )
+
+        yPos = 380
+        if not self.highScores:
+            self.drawText(
+                "No scores yet!", fontSizeText,
+                colorSecondaryText, screenWidth / 2, yPos
+            )
+        else:
+            for idx, entry in enumerate(self.highScores):
+                scoreText = (f"{idx + 1}. "
+                             f"{entry['name']} - {entry['score']}")
+                self.drawText(
+                    scoreText, fontSizeText,
+                    colorWhite, screenWidth / 2, yPos
+                )
+                yPos += 40
+
+        inputY = screenHeight - 300
+        self.drawText(
+            "ENTER YOUR NAME:", fontSizeSubtitle,
+            colorPlatform, screenWidth / 2, inputY
+        )
+        self.drawText(
+            self.playerName + cursor, fontSizeSubtitle,
+            colorWhite, screenWidth / 2, inputY + 60
+        )
+        self.drawText(
+            "WASD / Arrows to move, SPACE to jump", fontSizeText,
+            colorSecondaryText, screenWidth / 2, screenHeight - 100
+        )
+
     def showGameOverScreen(self):
         if not self.isRunning:
             return
         self.saveHighScore()
         waiting = True
+        needsRedraw = True
         while waiting:
-            self.clock.tick(frameRate)
-            if self.bgGameOverImg:
-                scaledBg = pygame.transform.scale(
-                    self.bgGameOverImg, (screenWidth, screenHeight)
-                )
-                self.screen.blit(scaledBg, (0, 0))
-            elif self.bgGameImg:
-                scaledBg = pygame.transform.scale(
-                    self.bgGameImg, (screenWidth, screenHeight)
-                )
-                self.screen.blit(scaledBg, (0, 0))
-            else:
-                self.screen.fill(colorBlack)
-
-            self.drawText(
-                "GAME OVER", fontSizeTitle,
-                colorLava, screenWidth / 2, screenHeight / 3
-            )
-            self.drawText(
-                f"Final Score: {int(self.score)}", fontSizeSubtitle,
-                colorWhite, screenWidth / 2, screenHeight / 2
-            )
-            self.drawText(
-                "Press SPACE to return to Menu", fontSizeText,
-                colorSecondaryText, screenWidth / 2, screenHeight * 3 / 4
-            )
-            pygame.display.flip()
+            self.clock.tick(self.frameRate)
+            # Nothing animates here, so the screen is drawn only once
+            if needsRedraw:
+                needsRedraw = False
+                self.drawGameOverScreen()
+                pygame.display.flip()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     waiting = False
                     self.isRunning = False
+                if event.type == pygame.WINDOWEXPOSED:
+                    needsRedraw = True
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         waiting = False
 
+    def drawGameOverScreen(self):
+        self.backgrounds.draw(self.screen, "gameOver")
+
+        self.drawText(
+            "GAME OVER", fontSizeTitle,
+            colorLava, screenWidth / 2, screenHeight / 3
+        )
+        self.drawText(
+            f"Final Score: {int(self.score)}", fontSizeSubtitle,
+            colorWhite, screenWidth / 2, screenHeight / 2
+        )
+        self.drawText(
+            "Press SPACE to return to Menu", fontSizeText,
+            colorSecondaryText, screenWidth / 2, screenHeight * 3 / 4
+        )
+
     def run(self):
         while self.isRunning:
             self.showStartScreen()
@@ -326,33 +531,189 @@ class InfernoGame:
                 break
             self.setupGame()
             self.isPlaying = True
-            while self.isPlaying:
-                self.handleEvents()
-                self.updateLogic()
-                self.drawScene()
-                self.clock.tick(frameRate)
+            self.profiler.reset()
+            self.runSession()
+            self.showDeath()
+            self.saveAssetCache()
+            if profilerExportFormat:
+                self.exportProfile(profilerExportFormat)
             self.showGameOverScreen()
+        # Waits for the runs still queued for the database
+        self.scoreStore.close()
         pygame.quit()
         sys.exit()
 
-    def handleEvents(self):
+    def runSession(self):
+        """
+        Fixed-timestep game loop. The simulation advances in ticks of
+        1/tickRate seconds no matter how fast frames are drawn; each frame
+        renders once, interpolated between the last two ticks. When the
+        machine falls behind, at most maxCatchUpSteps ticks run per frame
+        and the rest of the backlog is dropped.
+        """
+        tickLength = 1.0 / tickRate
+        accumulator = 0.0
+        previousTime = time.perf_counter()
+        while self.isPlaying:
+            now = time.perf_counter()
+            accumulator += now - previousTime
+            previousTime = now
+
+            self.profiler.beginFrame()
+            self.handleEvents(now)
+            self.profiler.mark("events")
+            steps = 0
+            while accumulator >= tickLength and self.isPlaying:
+                if steps == maxCatchUpSteps:
+                    accumulator %= tickLength
+                    break
+                self.snapshotPositions()
+                self.updateLogic()
+                accumulator -= tickLength
+                steps += 1
+
+            self.profiler.restart()
+            self.drawScene(accumulator / tickLength)
+            self.profiler.frameShown()
+            self.profiler.mark("draw")
+
+            # Plan upcoming platforms with whatever is left of the frame
+            deadline = now + 1.0 / self.frameRate - levelIdleMargin
+            self.levelGenerator.prefill(deadline)
+            self.profiler.mark("generation")
+            self.profiler.endFrame(self.spriteCounts())
+            self.clock.tick(self.frameRate)
+
+    def showDeath(self):
+        """
+        Keeps the final scene on screen for deathDelay seconds with only
+        the particles moving, so the hit sparks are seen before the
+        game-over screen. The simulation is over and stays untouched.
+        """
+        if not self.particles.count:
+            return
+        tickLength = 1.0 / tickRate
+        accumulator = 0.0
+        start = previousTime = time.perf_counter()
+        while self.isRunning and previousTime - start < deathDelay:
+            self.clock.tick(self.frameRate)
+            now = time.perf_counter()
+            accumulator += now - previousTime
+            previousTime = now
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.isRunning = False
+            while accumulator >= tickLength:
+                self.particles.update()
+                accumulator -= tickLength
+            self.drawScene()
+
+    def spriteCounts(self):
+        return {
+            "spriteCount": len(self.allSprites),
+            "platformCount": len(self.platforms),
+            "hazardCount": len(self.hazards),
+            "awakeCount": self.awakeCount,
+            "sleepingCount": self.sleepingCount,
+            "particleCount": self.particles.count,
+        }
+
+    def exportProfile(self, extension="csv"):
+        """
+        Saves the profiler's frame records of the current session.
+        """
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        filePath = os.path.join(profilesFolder, f"profile_{stamp}.{extension}")
+        try:
+            self.profiler.export(filePath)
+            print(f"Profile saved to {filePath}")
+        except IOError:
+            print("Error saving profile.")
+
+    def snapshotPositions(self):
+        """
+        Remembers where every sprite was before the next tick, so the
+        renderer can interpolate towards the new positions.
+        """
+        self.previousPositions = {
+            sprite: sprite.rect.topleft for sprite in self.allSprites
+        }
+        self.previousScrollOffset = self.scrollOffset
+
+    def forgetPosition(self, sprite):
+        """
+        A sprite spawned during a tick has no previous position. Pooled
+        sprites may still have one from their last life, which would make
+        the renderer draw them between the old and the new place.
+        """
+        self.previousPositions.pop(sprite, None)
+
+    def cameraBottom(self):
+        """
+        World y of the bottom edge of the screen.
+        """
+        return screenHeight - self.scrollOffset
+
+    def runHeadless(self, maxTicks=headlessMaxTicks, seed=None):
+        """
+        Plays a single session without rendering or frame limiting.
+        Input comes only from the injected input source.
+        Returns the final score.
+        """
+        self.setupGame(seed)
+        self.isPlaying = True
+        while self.isPlaying and self.ticks < maxTicks:
+            self.updateLogic()
+        return self.score
+
+    def handleEvents(self, now):
+        """
+        Window and debug keys act right away; gameplay events are stamped
+        with the frame time 'now' and queued for the next tick, which may
+        run in this frame (see applyInput).
+        """
+        self.inputTime = now
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.isPlaying = False
                 self.isRunning = False
             if event.type == pygame.KEYDOWN:
-                if event.key in [pygame.K_SPACE, pygame.K_UP, pygame.K_w]:
-                    self.player.jump()
+                if event.key == pygame.K_F3:
+                    self.profiler.toggleOverlay()
+                elif event.key == pygame.K_F4:
+                    self.exportProfile()
+            self.inputQueue.push(event, now)
+
+    def applyInput(self):
+        """
+        Hands the events pumped so far to the input source, then polls it
+        once and gives the actions to the player. The first tick of a
+        frame takes that frame's events; when a frame runs no tick they
+        wait for the next one.
+        """
+        for stamp, event in self.inputQueue.due(self.inputTime):
+            if self.inputSource.handleEvent(event):
+                self.profiler.inputApplied(stamp)
+        actions = self.inputSource.poll()
+        self.inputLog.append(actions)
+        player = self.player
+        player.controls = actions
+        if actions & INPUT_JUMP:
+            player.jump()
+        player.applyJump()
 
     def updateLogic(self):
+        self.ticks += 1
+        profiler = self.profiler
+        profiler.restart()
+        self.applyInput()
         self.player.onGround = False
-        self.allSprites.update()
+        self.updateSprites()
+        profiler.mark("update")
 
         # Platform Collisions
         if self.player.velocityY > 0:
-            hits = pygame.sprite.spritecollide(
-                self.player, self.platforms, False
-            )
+            hits = self.platforms.query(self.player.rect)
             if hits:
                 lowestHit = None
                 for hit in hits:
@@ -367,63 +728,137 @@ class InfernoGame:
 
                 if lowestHit:
                     if self.player.rect.bottom > lowestHit.rect.top:
+                        landingSpeed = self.player.velocityY
                         # VISUAL FIX: Sink 35px into the platform
                         self.player.rect.bottom = lowestHit.rect.top + 35
                         self.player.velocityY = 0
+                        self.player.remainderY = 0.0
                         self.player.onGround = True
+                        if landingSpeed >= landingDustSpeed:
+                            self.particles.emit(
+                                "dust", self.player.rect.centerx,
+                                self.player.rect.bottom, landingDustCount,
+                                self.player.rect.width / 4
+                            )
+
+        profiler.mark("platforms")
 
         # Hazard Collisions
-        hitHazard = pygame.sprite.spritecollide(
-            self.player, self.hazards, False, pygame.sprite.collide_mask
-        )
+        hitHazard = self.hazards.collideMask(self.player)
         if hitHazard:
-            self.isPlaying = False
-
-        # Scrolling
-        if self.player.rect.top <= screenHeight / 2:
-            scrollSpeed = abs(self.player.velocityY)
-            self.player.rect.y += scrollSpeed
-
-            for plat in self.platforms:
-                plat.rect.y += scrollSpeed
-                if plat.rect.top >= screenHeight:
-                    plat.kill()
-                    self.score += 1
-
-            self.lava.rect.y += scrollSpeed
-            if self.lava.rect.top > screenHeight:
-                self.lava.rect.top = screenHeight
-
-            for sprite in self.hazards:
-                if isinstance(sprite, (Lava, Spike, PatrolEnemy, RangedEnemy)):
-                    pass
-                else:
-                    sprite.rect.y += scrollSpeed
-
-        while len(self.platforms) < maxPlatforms:
+            impact = self.player.rect.clip(hitHazard[0].rect)
+            self.particles.emit("spark", *impact.center, hitSparkCount)
+            self.endRun(hitHazard[0].hazardName)
+        elif self.lava.collidesWith(self.player):
+            self.endRun("lava")
+        profiler.mark("hazards")
+
+        # Scrolling only moves the camera; the world stays where it is
+        if self.player.rect.top + self.scrollOffset <= screenHeight / 2:
+            # Whole pixels, so screen positions stay integers
+            self.scrollOffset += round(abs(self.player.velocityY) * tickScale)
+            self.lava.clampDepth()
+
+            # Every platform the camera leaves behind counts as climbed
+            for plat in self.platforms.below(self.cameraBottom()):
+                plat.kill()
+                self.score += 1
+
+        profiler.mark("scrolling")
+
+        while len(self.platforms) < self.maxPlatforms:
             self.spawnPlatform()
+        profiler.mark("spawning")
 
-        if self.player.rect.top > screenHeight:
-            self.isPlaying = False
+        self.particles.update()
+        profiler.mark("particles")
+
+        if self.player.rect.top > self.cameraBottom():
+            self.endRun("fall")
 
         self.player.animate()
 
-    def drawScene(self):
-        if self.bgGameImg:
-            scaledBg = pygame.transform.scale(
-                self.bgGameImg, (screenWidth, screenHeight)
-            )
-            self.screen.blit(scaledBg, (0, 0))
+    def activeBand(self):
+        """
+        World area in which hazards are simulated: the view plus
+        activeMargin above and below it, and wide enough to keep
+        projectiles awake until they leave the screen sideways.
+        """
+        return pygame.Rect(
+            -screenWidth, -self.scrollOffset - activeMargin,
+            screenWidth * 3, screenHeight + activeMargin * 2
+        )
+
+    def updateSprites(self):
+        """
+        Steps the player, the lava and the hazards near the camera.
+        Platforms never move; hazards outside the active band sleep, so
+        the cost follows what is around the player, not the whole level.
+        """
+        self.player.update()
+        self.lava.update()
+        band = self.activeBand()
+        hazardCount = len(self.hazards)
+        if self.entityStore is None:
+            awake = self.hazards.query(band)
+            for sprite in awake:
+                sprite.update()
+            self.awakeCount = len(awake)
         else:
-            self.screen.fill(colorBlack)
-        self.allSprites.draw(self.screen)
-        self.drawText(
+            # Hazards are stepped in one batch
+            self.awakeCount = self.entityStore.update(band)
+        self.sleepingCount = hazardCount - self.awakeCount
+
+    def endRun(self, cause):
+        """
+        Ends the current run; the first cause reported in a tick is kept.
+        """
+        if self.isPlaying:
+            self.deathCause = cause
+        self.isPlaying = False
+
+    def poolStats(self):
+        """
+        Live/free counts of every sprite pool, keyed by class name.
+        """
+        return {
+            spriteClass.__name__: pool.stats()
+            for spriteClass, pool in self.pools.items()
+        }
+
+    def drawScene(self, alpha=1.0):
+        """
+        Renders the current state. 'alpha' is how far the frame lies between
+        the previous tick (0.0) and the latest one (1.0).
+        """
+        self.renderer.drawScene(alpha)
+
+    def drawHud(self):
+        """
+        Draws the score over the scene and returns the area it covers.
+        """
+        hudRect = self.drawText(
             f"Score: {int(self.score)}", fontSizeText,
             colorWhite, screenWidth / 2, 20
         )
-        pygame.display.flip()
+        if self.profiler.overlayVisible:
+            overlayRect = self.profiler.drawOverlay(
+                self.screen, self.textRenderer
+            )
+            hudRect = hudRect.union(overlayRect)
+        return hudRect
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InfernoGame")
+    parser.add_argument("--preset", choices=sorted(performancePresets),
+                        help="performance preset (default: "
+                             f"${presetEnvVar}, performance.json or "
+                             f"'{defaultPreset}')")
+    args = parser.parse_args()
+    gameInstance = InfernoGame(preset=loadPreset(args.preset))
+    gameInstance.run()
 
 
 if __name__ == "__main__":
-    gameInstance = InfernoGame()
-    gameInstance.run()
+    main()
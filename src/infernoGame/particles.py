@@ -0,0 +1,262 @@
+"""
+Batched particle effects for InfernoGame: lava embers, landing dust and
+hit sparks.
+Particles are not sprites. Their state lives in fixed-size NumPy arrays,
+one column per property, and every tick moves all of them in a few
+vectorized operations. They are drawn with one batched blit per frame
+from a small set of pre-rendered images, one per kind and fade step.
+
+The preset's particleBudget caps how many are alive at once. Past
+particleSoftLimit of the budget, new particles are accepted with falling
+probability, so heavy bursts thin out instead of stopping abruptly.
+Particles are cosmetic: they have their own random stream and never
+touch the simulation, so replays are unaffected.
+
+NumPy is optional; without it the game runs without particles.
+"""
+import pygame
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from settings import *
+
+# name -> look and motion of a particle kind. Lives are in seconds,
+# speeds, gravity (per tick) and radii in pixels; angles are degrees,
+# -90 is straight up. drag is the share of speed kept each tick.
+particleKinds = {
+    "ember": {
+        "color": colorEmber, "radius": 4, "life": (0.5, 1.2),
+        "speed": (5.0, 9.0), "angle": (-90, 20), "gravity": -0.05,
+        "drag": 0.97,
+    },
+    "dust": {
+        "color": colorDust, "radius": 6, "life": (0.25, 0.5),
+        "speed": (1.0, 4.0), "angle": (-90, 80), "gravity": 0.15,
+        "drag": 0.9,
+    },
+    "spark": {
+        "color": colorSpark, "radius": 3, "life": (0.15, 0.4),
+        "speed": (4.0, 10.0), "angle": (-90, 180), "gravity": 0.4,
+        "drag": 0.95,
+    },
+}
+
+# name -> dtype of every per-particle column
+particleColumns = {
+    "kind": "int8",
+    "x": "float32",
+    "y": "float32",
+    "velocityX": "float32",
+    "velocityY": "float32",
+    "age": "int32",
+    "life": "int32",
+}
+
+
+def particlesAvailable():
+    return numpy is not None
+
+
+class ParticleSystem:
+    """
+    Fixed-capacity particle store.
+
+    Rows 0..count-1 of every column are the live particles; dead ones are
+    compacted away after each update, so the live rows stay contiguous.
+    Positions are in world coordinates like the sprites.
+    """
+
+    def __init__(self, game, budget):
+        self.game = game
+        self.budget = budget
+        self.softLimit = int(budget * particleSoftLimit)
+        self.count = 0
+        self.dropped = 0
+        self.columns = {
+            name: numpy.zeros(budget, dtype)
+            for name, dtype in particleColumns.items()
+        }
+        self.kindCodes = {
+            name: code for code, name in enumerate(particleKinds)
+        }
+        kinds = particleKinds.values()
+        self.gravity = numpy.array(
+            [kind["gravity"] * tickScale for kind in kinds], numpy.float32
+        )
+        self.drag = numpy.array(
+            [kind["drag"] ** tickScale for kind in kinds], numpy.float32
+        )
+        self.rng = numpy.random.default_rng()
+        self.buildImages(game.renderScale)
+
+    def buildImages(self, scale):
+        """
+        Pre-renders every kind at every fade step, at render resolution.
+        Image kind * particleFadeSteps + step is drawn centered, so
+        self.offsets holds half its size.
+        """
+        self.images = []
+        offsets = []
+        for kind in particleKinds.values():
+            for step in range(particleFadeSteps):
+                fade = 1.0 - step / particleFadeSteps
+                radius = max(
+                    1, round(kind["radius"] * scale * (0.5 + fade / 2))
+                )
+                image = pygame.Surface(
+                    (radius * 2, radius * 2), pygame.SRCALPHA
+                )
+                pygame.draw.circle(
+                    image, kind["color"] + (round(255 * fade),),
+                    (radius, radius), radius
+                )
+                self.images.append(image.convert_alpha())
+                offsets.append(radius)
+        self.offsets = numpy.array(offsets, numpy.float32)
+        self.maxRadius = int(self.offsets.max()) / scale
+
+    def reset(self, seed=None):
+        """
+        Drops every particle; the same seed gives the same effects.
+        """
+        self.count = 0
+        self.dropped = 0
+        self.rng = numpy.random.default_rng(seed)
+
+    def accepted(self, requested):
+        """
+        How many of 'requested' new particles fit in the budget.
+        """
+        free = self.budget - self.count
+        if self.count > self.softLimit:
+            # Thin out towards nothing at the hard limit
+            requested = int(self.rng.binomial(
+                requested, free / (self.budget - self.softLimit)
+            ))
+        return min(requested, free)
+
+    def emit(self, name, x, y, requested, spreadX=0.0, spreadY=0.0):
+        """
+        Spawns up to 'requested' particles of kind 'name' around (x, y),
+        spread uniformly by up to spreadX/spreadY. Returns how many were
+        spawned.
+        """
+        count = self.accepted(requested)
+        self.dropped += requested - count
+        if count <= 0:
+            return 0
+        kind = particleKinds[name]
+        rng = self.rng
+        rows = slice(self.count, self.count + count)
+        c = self.columns
+        c["kind"][rows] = self.kindCodes[name]
+        c["x"][rows] = x + rng.uniform(-spreadX, spreadX, count)
+        c["y"][rows] = y + rng.uniform(-spreadY, spreadY, count)
+        center, spread = kind["angle"]
+        angle = numpy.radians(center + rng.uniform(-spread, spread, count))
+        speed = rng.uniform(*kind["speed"], count)
+        c["velocityX"][rows] = numpy.cos(angle) * speed
+        c["velocityY"][rows] = numpy.sin(angle) * speed
+        shortest, longest = kind["life"]
+        c["life"][rows] = rng.integers(
+            max(1, round(shortest * tickRate)),
+            max(1, round(longest * tickRate)) + 1, count
+        )
+        c["age"][rows] = 0
+        self.count += count
+        return count
+
+    def update(self):
+        """
+        One simulation tick for every live particle.
+        """
+        n = self.count
+        if n == 0:
+            return
+        c = self.columns
+        kind = c["kind"][:n]
+        velocityX = c["velocityX"][:n]
+        velocityY = c["velocityY"][:n]
+        drag = self.drag[kind]
+        velocityY += self.gravity[kind]
+        velocityX *= drag
+        velocityY *= drag
+        c["x"][:n] += velocityX * tickScale
+        c["y"][:n] += velocityY * tickScale
+        age = c["age"][:n]
+        age += 1
+
+        alive = age < c["life"][:n]
+        live = int(numpy.count_nonzero(alive))
+        if live < n:
+            for column in c.values():
+                column[:live] = column[:n][alive]
+            self.count = live
+
+    def draw(self, surface, camera, alpha=1.0, scale=1, doreturn=False):
+        """
+        Blits the visible particles in one call, 'alpha' of the way from
+        the previous tick to the latest one. 'camera' is the scroll
+        offset to draw with. Returns the drawn rects if 'doreturn'.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        c = self.columns
+        # Step back along the velocity instead of keeping old positions
+        back = (1.0 - min(alpha, 1.0)) * tickScale
+        x = c["x"][:n] - c["velocityX"][:n] * back
+        y = c["y"][:n] - c["velocityY"][:n] * back + camera
+        visible = numpy.flatnonzero(
+            (y > -self.maxRadius) & (y < screenHeight + self.maxRadius)
+        )
+        if len(visible) == 0:
+            return []
+        age = c["age"][visible]
+        step = numpy.minimum(
+            age * particleFadeSteps // c["life"][visible],
+            particleFadeSteps - 1
+        )
+        index = c["kind"][visible].astype(numpy.int32) * particleFadeSteps
+        index += step
+        offset = self.offsets[index]
+        left = (x[visible] * scale - offset).tolist()
+        top = (y[visible] * scale - offset).tolist()
+        images = self.images
+        sequence = [
+            (images[i], position)
+            for i, position in zip(index.tolist(), zip(left, top))
+        ]
+        if doreturn:
+            return surface.blits(sequence)
+        # pygame-ce has a faster variant that never builds rects
+        fblits = getattr(surface, "fblits", None)
+        if fblits is not None:
+            fblits(sequence)
+        else:
+            surface.blits(sequence, False)
+        return []
+
+
+class NullParticles:
+    """
+    Stand-in when there is nothing to draw (headless, no NumPy or a
+    budget of 0): same interface, keeps nothing.
+    """
+    count = 0
+    dropped = 0
+
+    def reset(self, seed=None):
+        pass
+
+    def emit(self, name, x, y, requested, spreadX=0.0, spreadY=0.0):
+        return 0
+
+    def update(self):
+        pass
+
+    def draw(self, surface, camera, alpha=1.0, scale=1, doreturn=False):
+        return []
@@ -0,0 +1,64 @@
+"""
+Object pools for InfernoGame sprites.
+Killed sprites go back to their pool and are reset for the next spawn,
+so long runs stop allocating new sprites and surfaces.
+"""
+
+
+class SpritePool:
+    """
+    Recycles instances of one sprite class.
+    The class must accept the same arguments in __init__ and reset().
+    At most 'capacity' free instances are kept; extra ones are dropped.
+    """
+
+    def __init__(self, spriteClass, capacity):
+        self.spriteClass = spriteClass
+        self.capacity = capacity
+        self.free = []
+        self.live = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.spriteClass(*args)
+            self.created += 1
+        sprite.pool = self
+        self.live[sprite] = None
+        return sprite
+
+    def release(self, sprite):
+        if sprite not in self.live:
+            return
+        del self.live[sprite]
+        if len(self.free) < self.capacity:
+            self.free.append(sprite)
+
+    def releaseAll(self):
+        """
+        Returns every live sprite to the pool, e.g. when a new game starts
+        and the sprite groups are emptied without killing their members.
+        """
+        for sprite in list(self.live):
+            self.release(sprite)
+
+    @property
+    def liveCount(self):
+        return len(self.live)
+
+    @property
+    def freeCount(self):
+        return len(self.free)
+
+    def stats(self):
+        return {
+            "live": self.liveCount,
+            "free": self.freeCount,
+            "created": self.created,
+            "reused": self.reused,
+        }
@@ -0,0 +1,97 @@
+"""
+Runtime performance presets for InfernoGame.
+A preset bundles the settings that trade looks for speed: the internal
+render resolution (upscaled to the window by pygame.SCALED), lava
+blending, the game background, the target frame rate and the particle
+budget.
+
+The preset is chosen by, highest priority first, the --preset command
+line option, the INFERNO_PRESET environment variable or the "preset" key
+of performance.json next to the game. The file may also override single
+values, e.g. {"preset": "low", "frameRate": 45}, which apply on top of
+whichever preset was chosen. Values of the wrong type are reported and
+the preset's own value is kept.
+"""
+import json
+import os
+
+from settings import (
+    performancePresets, defaultPreset, presetFile, presetEnvVar
+)
+
+
+def readPresetFile(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            config = json.load(f)
+    except (ValueError, IOError) as e:
+        print(f"Could not read {path}: {e}")
+        return {}
+    if not isinstance(config, dict):
+        print(f"Ignoring {path}: expected a JSON object")
+        return {}
+    return config
+
+
+def convertValue(value, default):
+    """
+    Returns 'value' from the JSON file as the type of the preset's
+    'default'. Raises ValueError unless it is a JSON bool for a bool
+    setting or a JSON number for a numeric one.
+    """
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ValueError("expected true or false")
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("expected a number")
+    if isinstance(default, int) and value != int(value):
+        raise ValueError("expected a whole number")
+    return type(default)(value)
+
+
+def checkValues(values):
+    """
+    Raises ValueError when a preset value is out of range.
+    """
+    if not 0 < values["renderScale"] <= 1:
+        raise ValueError("renderScale must be in (0, 1]")
+    if values["frameRate"] <= 0:
+        raise ValueError("frameRate must be positive")
+    if values["particleBudget"] < 0:
+        raise ValueError("particleBudget must not be negative")
+
+
+def loadPreset(name=None, path=presetFile, environ=os.environ):
+    """
+    Returns the performance values to run with as a dict, including the
+    chosen preset's "name". 'name' is the command line choice, if any.
+    """
+    config = readPresetFile(path)
+    name = name or environ.get(presetEnvVar) or config.get("preset")
+    if name is None:
+        name = defaultPreset
+    elif not isinstance(name, str) or name not in performancePresets:
+        print(f"Unknown performance preset '{name}', using "
+              f"'{defaultPreset}'")
+        name = defaultPreset
+
+    values = dict(performancePresets[name])
+    for key, value in config.items():
+        if key in values:
+            try:
+                values[key] = convertValue(value, values[key])
+            except (ValueError, OverflowError) as e:
+                print(f"{path}: bad {key} {value!r} ({e}), using the "
+                      f"'{name}' default")
+        elif key != "preset":
+            print(f"Ignoring unknown setting '{key}' in {path}")
+    try:
+        checkValues(values)
+    except ValueError as e:
+        print(f"{path}: {e}, using the '{name}' defaults")
+        values = dict(performancePresets[name])
+    values["name"] = name
+    return values
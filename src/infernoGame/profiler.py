@@ -0,0 +1,261 @@
+"""
+Built-in frame profiler for InfernoGame.
+Game code marks the end of each subsystem with mark(); the profiler keeps
+per-frame timings, shows them in a toggleable overlay (F3) with a rolling
+frame-time graph, and exports the session to CSV or JSON. It also tracks
+the latency from input events to the frame that shows their effect.
+"""
+import csv
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+from settings import *
+
+# Subsystems in the order they run during a frame
+profilerSections = (
+    "events", "update", "platforms", "hazards", "scrolling", "spawning",
+    "particles", "draw", "generation",
+)
+
+
+class InputLatency:
+    """
+    Input-to-display latency: time from the moment an input event was
+    pumped to the end of the first frame drawn after the tick that
+    applied it.
+    """
+
+    def __init__(self, history=inputLatencyHistory):
+        self.pending = []
+        self.samples = deque(maxlen=history)
+
+    def applied(self, stamp):
+        self.pending.append(stamp)
+
+    def shown(self, now):
+        """
+        Closes the pending events on a displayed frame and returns their
+        latencies in seconds.
+        """
+        latencies = [now - stamp for stamp in self.pending]
+        self.pending = []
+        self.samples.extend(latencies)
+        return latencies
+
+    def stats(self):
+        """
+        Mean, median, 95th percentile and max of the recent samples in
+        seconds, or None before the first input.
+        """
+        ordered = sorted(self.samples)
+        if not ordered:
+            return None
+
+        def rank(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered),
+            "p50": rank(0.50),
+            "p95": rank(0.95),
+            "max": ordered[-1],
+        }
+
+    def reset(self):
+        self.pending = []
+        self.samples.clear()
+
+
+class FrameProfiler:
+    """
+    Collects section timings for every frame of a session.
+    mark(section) charges the time since the previous mark (or restart)
+    to 'section'; time that is not marked shows up as "other".
+
+    Frame records for export are only kept while the overlay is shown or
+    when 'keepRecords' is set, as one tuple per frame (columns in
+    self.recordFields) in a ring buffer of the latest profilerMaxRecords
+    frames.
+    """
+
+    def __init__(self, history=profilerHistory, targetFrameRate=frameRate,
+                 keepRecords=False):
+        self.overlayVisible = False
+        self.keepRecords = keepRecords
+        self.budget = 1.0 / targetFrameRate
+        self.frameTimes = deque(maxlen=history)
+        self.records = deque(maxlen=profilerMaxRecords)
+        self.recordFields = None
+        self.current = dict.fromkeys(profilerSections, 0.0)
+        self.shown = self.current
+        self.counts = {}
+        self.frameStart = time.perf_counter()
+        self.lastMark = self.frameStart
+        self.frameIndex = 0
+        self.inputLatency = InputLatency()
+        self.frameLatency = None
+
+    def beginFrame(self):
+        self.current = dict.fromkeys(profilerSections, 0.0)
+        self.frameStart = self.lastMark = time.perf_counter()
+
+    def restart(self):
+        self.lastMark = time.perf_counter()
+
+    def mark(self, section):
+        now = time.perf_counter()
+        self.current[section] += now - self.lastMark
+        self.lastMark = now
+
+    def inputApplied(self, stamp):
+        """
+        An input event stamped at 'stamp' was applied by a tick.
+        """
+        self.inputLatency.applied(stamp)
+
+    def frameShown(self):
+        """
+        Call right after the frame reached the display.
+        """
+        latencies = self.inputLatency.shown(time.perf_counter())
+        if latencies:
+            self.frameLatency = max(latencies)
+
+    def endFrame(self, counts):
+        """
+        Closes the frame. 'counts' maps group names to sprite counts.
+        """
+        total = time.perf_counter() - self.frameStart
+        self.frameTimes.append(total)
+        self.counts = counts
+        if self.frameIndex % profilerOverlayRefresh == 0:
+            # Refresh the overlay numbers a few times per second only
+            self.shown = self.current
+        if self.keepRecords or self.overlayVisible:
+            self.record(total, counts)
+        self.frameLatency = None
+        self.frameIndex += 1
+
+    def record(self, total, counts):
+        if self.recordFields is None:
+            self.recordFields = (
+                ("frame", "total") + profilerSections + ("other",) +
+                tuple(counts) + ("inputLatency",)
+            )
+        sections = self.current.values()
+        # The last column is the worst input latency this frame showed
+        self.records.append((
+            self.frameIndex, total, *sections, total - sum(sections),
+            *counts.values(), self.frameLatency
+        ))
+
+    def reset(self):
+        self.frameTimes.clear()
+        self.records.clear()
+        self.frameIndex = 0
+        self.inputLatency.reset()
+        self.frameLatency = None
+
+    def toggleOverlay(self):
+        self.overlayVisible = not self.overlayVisible
+
+    def drawOverlay(self, surface, textRenderer):
+        """
+        Draws the timing panel and frame-time graph; returns the area used.
+        """
+        panel = pygame.Rect(10, 10, 330, 0)
+        lines = [
+            f"{name:<14}{self.shown[name] * 1000:6.2f} ms"
+            for name in profilerSections
+        ]
+        lines += [f"{name:<14}{count:6d}" for name, count in
+                  self.counts.items()]
+        latency = self.inputLatency.stats()
+        if latency:
+            lines += [
+                f"{'input p50':<14}{latency['p50'] * 1000:6.2f} ms",
+                f"{'input p95':<14}{latency['p95'] * 1000:6.2f} ms",
+            ]
+        lineHeight = profilerFontSize + 2
+        graphTop = panel.top + 8 + lineHeight * len(lines) + 6
+        panel.height = graphTop - panel.top + profilerGraphHeight + 8
+
+        surface.fill(colorBlack, panel)
+        y = panel.top + 8
+        for line in lines:
+            text = textRenderer.render(line, profilerFontSize, colorWhite)
+            surface.blit(text, (panel.left + 8, y))
+            y += lineHeight
+
+        # One bar per frame; the accent line marks the frame budget
+        graphBottom = graphTop + profilerGraphHeight
+        budget = self.budget
+        scale = profilerGraphHeight / (budget * 2)
+        for index, frameTime in enumerate(self.frameTimes):
+            height = min(profilerGraphHeight, int(frameTime * scale))
+            color = colorLava if frameTime > budget else colorPlatform
+            x = panel.left + 8 + index * (panel.width - 16) // max(
+                1, self.frameTimes.maxlen
+            )
+            pygame.draw.line(
+                surface, color, (x, graphBottom), (x, graphBottom - height)
+            )
+        budgetY = graphBottom - int(budget * scale)
+        pygame.draw.line(
+            surface, colorAccent, (panel.left + 8, budgetY),
+            (panel.right - 8, budgetY)
+        )
+        return panel
+
+    def export(self, filePath):
+        """
+        Writes every recorded frame to 'filePath' (.csv or .json).
+        """
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        fields = self.recordFields or (
+            ("frame", "total") + profilerSections + ("other",)
+        )
+        if filePath.endswith(".json"):
+            with open(filePath, "w") as f:
+                json.dump([dict(zip(fields, row)) for row in self.records], f)
+            return
+        with open(filePath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            writer.writerows(self.records)
+
+
+class NullProfiler:
+    """
+    Stand-in for headless games: same interface, records nothing.
+    """
+    overlayVisible = False
+
+    def beginFrame(self):
+        pass
+
+    def restart(self):
+        pass
+
+    def mark(self, section):
+        pass
+
+    def inputApplied(self, stamp):
+        pass
+
+    def frameShown(self):
+        pass
+
+    def endFrame(self, counts):
+        pass
+
+    def reset(self):
+        pass
+
+    def toggleOverlay(self):
+        pass
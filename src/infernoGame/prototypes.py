@@ -0,0 +1,172 @@
+"""
+Shared sprite prototypes for InfernoGame.
+Scaling, trimming and mask generation happen once per (asset, size) pair;
+every sprite of that kind then reuses the same image and mask. Sprites
+that come in any width (platforms) draw from a SlicedTexture instead,
+into an image shared by the live sprites of the same size.
+"""
+import weakref
+
+import pygame
+
+
+def trim_image(img, min_height=10):
+    """
+    Automatic cropping: Removes transparent margins.
+    Safety: Prevents creating rects too small for physics.
+    """
+    try:
+        rect = img.get_bounding_rect()
+        if rect.height < min_height:
+            return img
+        return img.subsurface(rect).copy()
+    except ValueError:
+        return img
+
+
+class SpritePrototype:
+    """
+    Pre-built image and collision mask for one kind of sprite.
+    Both are shared between instances and must be treated as read-only.
+    """
+
+    def __init__(self, image, mask=None):
+        self.image = image
+        if mask is None:
+            mask = pygame.mask.from_surface(image)
+        self.mask = mask
+        self.size = image.get_size()
+
+
+class SlicedTexture:
+    """
+    One shared texture cut into a left cap, a middle part and a right
+    cap. draw() fills any width by repeating the middle between the caps,
+    so nothing is scaled or stretched per size. Only the width varies, so
+    the slicing is horizontal only.
+    """
+
+    def __init__(self, texture, capWidth):
+        self.texture = texture
+        width, height = texture.get_size()
+        capWidth = max(1, min(capWidth, width // 3))
+        self.capWidth = capWidth
+        self.height = height
+        self.left = texture.subsurface((0, 0, capWidth, height))
+        self.middle = texture.subsurface(
+            (capWidth, 0, width - capWidth * 2, height)
+        )
+        self.right = texture.subsurface(
+            (width - capWidth, 0, capWidth, height)
+        )
+
+    def draw(self, surface):
+        """
+        Draws the texture across the whole width of 'surface', which
+        should be transparent and as tall as the texture.
+        """
+        width = surface.get_width()
+        capWidth = min(self.capWidth, width // 2)
+        end = width - capWidth
+        tileWidth = self.middle.get_width()
+        blits = [(self.left, (0, 0), (0, 0, capWidth, self.height))]
+        for x in range(capWidth, end, tileWidth):
+            area = (0, 0, min(tileWidth, end - x), self.height)
+            blits.append((self.middle, (x, 0), area))
+        blits.append((
+            self.right, (end, 0),
+            (self.right.get_width() - capWidth, 0, capWidth, self.height)
+        ))
+        surface.blits(blits, False)
+
+
+class PrototypeCache:
+    """
+    Lazily builds and stores SpritePrototypes keyed by (asset, size).
+    With an AssetCache, images built from loaded files are also kept on
+    disk, so the next launch skips the scaling and trimming.
+    """
+
+    def __init__(self, assetCache=None):
+        self.assetCache = assetCache
+        self.prototypes = {}
+        self.surfaces = {}
+        self.slicedTextures = {}
+        # Only kept while some sprite still holds the image
+        self.sharedImages = weakref.WeakValueDictionary()
+
+    def get(self, assetName, size, source, fallback, flipX=False,
+            colorKey=None):
+        """
+        Returns the prototype for 'assetName' scaled to 'size'.
+        'source' is the loaded image (or None); 'fallback' is a callable
+        that draws a placeholder surface when the image is missing.
+        'flipX' gives the mirrored variant, built and cached separately.
+        """
+        key = (assetName, size, flipX)
+        prototype = self.prototypes.get(key)
+        if prototype is None:
+            def build():
+                if source:
+                    image = trim_image(pygame.transform.scale(source, size))
+                    if colorKey is not None:
+                        image.set_colorkey(colorKey)
+                else:
+                    image = fallback()
+                if flipX:
+                    image = pygame.transform.flip(image, True, False)
+                return image
+
+            image = self.derive(key + (colorKey,), source, build)
+            prototype = SpritePrototype(image)
+            self.prototypes[key] = prototype
+        return prototype
+
+    def getSurface(self, key, builder, source=None):
+        """
+        Returns a shared decorative surface that needs no collision mask,
+        calling 'builder' the first time 'key' is requested. 'source' is
+        the loaded image the surface is made from, if any.
+        """
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.derive(key, source, builder)
+            self.surfaces[key] = surface
+        return surface
+
+    def getSliced(self, key, builder, capWidth, source=None):
+        """
+        Returns a shared SlicedTexture made from getSurface(key, ...).
+        """
+        sliced = self.slicedTextures.get(key)
+        if sliced is None:
+            texture = self.getSurface(key, builder, source)
+            sliced = SlicedTexture(texture, capWidth)
+            self.slicedTextures[key] = sliced
+        return sliced
+
+    def getShared(self, key, builder):
+        """
+        Returns the image for 'key' if a live sprite still uses it,
+        otherwise builds it with 'builder'. Holders keep it alive, so
+        images of sizes no longer on screen are freed.
+        """
+        image = self.sharedImages.get(key)
+        if image is None:
+            image = builder()
+            self.sharedImages[key] = image
+        return image
+
+    def derive(self, key, source, builder):
+        if self.assetCache is None or source is None:
+            return builder()
+        return self.assetCache.derive(key, source, builder)
+
+    def clear(self):
+        self.prototypes.clear()
+        self.surfaces.clear()
+        self.slicedTextures.clear()
+        self.sharedImages.clear()
+
+    def __len__(self):
+        return len(self.prototypes)
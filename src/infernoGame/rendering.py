@@ -0,0 +1,164 @@
+"""
+Scene renderers for InfernoGame.
+Sprites live in world coordinates; the renderers apply the camera offset
+(screen y = world y + game.scrollOffset). FullRenderer redraws the whole
+screen every frame. DirtyRenderer keeps the sprites in a LayeredDirty
+group and only pushes the changed areas to the display, falling back to a
+full redraw whenever the camera scrolls.
+"""
+import weakref
+
+import pygame
+
+from settings import screenWidth, screenHeight, colorBlack
+
+
+class FullRenderer:
+    """
+    Classic renderer: background, every visible sprite and the HUD, then
+    flip(). Sprites and the camera are drawn between their previous and
+    current tick positions. Below full render resolution, sprite images
+    are scaled once and kept for as long as the image is in use.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.scaledImages = weakref.WeakKeyDictionary()
+
+    def createGroup(self):
+        return pygame.sprite.LayeredUpdates()
+
+    def reset(self):
+        pass
+
+    def drawScene(self, alpha=1.0):
+        game = self.game
+        scale = game.renderScale
+        if game.drawBackground:
+            game.backgrounds.draw(
+                game.screen, "game", game.scrollOffset * scale
+            )
+        else:
+            game.screen.fill(colorBlack)
+        camera = game.previousScrollOffset + (
+            game.scrollOffset - game.previousScrollOffset
+        ) * min(alpha, 1.0)
+        blits = []
+        for sprite in game.allSprites.sprites():
+            x, y = self.interpolate(sprite, alpha)
+            y += camera
+            # Cull what the camera cannot see
+            if y < screenHeight and y + sprite.rect.height > 0:
+                if scale == 1:
+                    blits.append((sprite.image, (x, y)))
+                else:
+                    blits.append(
+                        (self.scaled(sprite.image), (x * scale, y * scale))
+                    )
+        game.screen.blits(blits, False)
+        game.particles.draw(game.screen, camera, alpha, scale)
+        game.drawHud()
+        pygame.display.flip()
+
+    def scaled(self, image):
+        """
+        'image' at the render resolution.
+        """
+        scaledImage = self.scaledImages.get(image)
+        if scaledImage is None:
+            scale = self.game.renderScale
+            width, height = image.get_size()
+            size = (
+                max(1, round(width * scale)), max(1, round(height * scale))
+            )
+            # Smooth scaling would blend color-keyed edges into the key
+            if image.get_colorkey() is None and image.get_bitsize() >= 24:
+                scaledImage = pygame.transform.smoothscale(image, size)
+            else:
+                scaledImage = pygame.transform.scale(image, size)
+            self.scaledImages[image] = scaledImage
+        return scaledImage
+
+    def interpolate(self, sprite, alpha):
+        """
+        World position of 'sprite' between the last two ticks.
+        """
+        x, y = sprite.rect.topleft
+        previous = self.game.previousPositions.get(sprite)
+        if previous is None or alpha >= 1.0:
+            return x, y
+        oldX, oldY = previous
+        # Skip the horizontal blend when the player wrapped around the screen
+        if abs(x - oldX) < screenWidth // 2:
+            x = oldX + (x - oldX) * alpha
+        return x, oldY + (y - oldY) * alpha
+
+
+class DirtyRenderer:
+    """
+    Dirty-rectangle renderer built on LayeredDirty.
+    Sprites that move every tick are flagged dirty=2 and redrawn each
+    frame; static sprites are only redrawn where something passed over
+    them. A scroll moves every sprite, so those frames repaint everything.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.lastScrollOffset = None
+        self.hudRect = None
+        self.particleRect = None
+        self.blank = None
+
+    def createGroup(self):
+        return pygame.sprite.LayeredDirty()
+
+    def reset(self):
+        self.lastScrollOffset = None
+        self.hudRect = None
+        self.particleRect = None
+
+    def drawScene(self, alpha=1.0):
+        # Interpolation would move every sprite every frame, which defeats
+        # dirty rectangles: this renderer always shows the latest tick.
+        game = self.game
+        screenRect = game.screen.get_rect()
+        if game.drawBackground:
+            background = game.backgrounds.getSurface(
+                "game", screenRect.size, game.scrollOffset
+            )
+        else:
+            if self.blank is None:
+                self.blank = pygame.Surface(screenRect.size).convert()
+                self.blank.fill(colorBlack)
+            background = self.blank
+
+        if game.scrollOffset != self.lastScrollOffset:
+            self.lastScrollOffset = game.scrollOffset
+            game.allSprites.repaint_rect(screenRect)
+        else:
+            # The HUD and particles are drawn over the sprites, clear
+            # where they were like a sprite
+            for rect in (self.hudRect, self.particleRect):
+                if rect:
+                    game.allSprites.repaint_rect(rect)
+
+        # LayeredDirty draws at sprite.rect, so the rects are moved into
+        # screen space for the draw call only.
+        offset = game.scrollOffset
+        sprites = game.allSprites.sprites()
+        for sprite in sprites:
+            sprite.rect.y += offset
+        dirtyRects = game.allSprites.draw(game.screen, background)
+        for sprite in sprites:
+            sprite.rect.y -= offset
+        particleRects = game.particles.draw(
+            game.screen, offset, doreturn=True
+        )
+        if particleRects:
+            self.particleRect = particleRects[0].unionall(particleRects[1:])
+            dirtyRects.append(self.particleRect)
+        else:
+            self.particleRect = None
+        self.hudRect = game.drawHud()
+        dirtyRects.append(self.hudRect)
+        pygame.display.update(dirtyRects)
@@ -0,0 +1,232 @@
+"""
+Run recording and replay for InfernoGame.
+A run is fully described by its seed and the action bitmask of every
+tick. Replays store both in a small binary file (the per-tick actions are
+run-length encoded) and can be re-simulated headlessly to check a score.
+
+Usage:
+    python replays.py               Verify every high score with a replay
+    python replays.py <file.ifr>    Re-simulate one replay
+    python replays.py --selftest    Check encoding and determinism
+"""
+import itertools
+import os
+import struct
+import sys
+import time
+
+from settings import replaysFolder, tickRate
+from controls import ScriptedInput, ClimberInput
+
+replayMagic = b"IFRP"
+# 2: levels come from the lookahead generator
+# 3: hazards outside the active band sleep
+# 4: jump buffering and coyote time
+# 5: platforms checked against the real jump reach
+replayVersion = 5
+# magic, version, seed, tick rate, tick count, score, name length
+headerFormat = "<4sBIHIIB"
+runFormat = "<BH"  # action bitmask, number of ticks it was held
+maxRunLength = 0xFFFF
+
+
+class Replay:
+    """
+    Seed, per-tick actions and final result of one recorded run.
+    """
+
+    def __init__(self, seed, inputs, score=0, name="", rate=tickRate):
+        self.seed = seed
+        self.inputs = bytes(inputs)
+        self.score = score
+        self.name = name
+        self.tickRate = rate
+
+    @classmethod
+    def fromGame(cls, game, name=""):
+        return cls(game.seed, game.inputLog, int(game.score), name)
+
+    def toBytes(self):
+        nameBytes = self.name.encode("utf-8")[:255]
+        chunks = [struct.pack(
+            headerFormat, replayMagic, replayVersion, self.seed,
+            self.tickRate, len(self.inputs), self.score, len(nameBytes)
+        ), nameBytes]
+
+        # Run-length encode: actions rarely change from one tick to the next
+        index = 0
+        total = len(self.inputs)
+        while index < total:
+            actions = self.inputs[index]
+            length = 1
+            while (index + length < total and length < maxRunLength and
+                   self.inputs[index + length] == actions):
+                length += 1
+            chunks.append(struct.pack(runFormat, actions, length))
+            index += length
+        return b"".join(chunks)
+
+    @classmethod
+    def fromBytes(cls, data):
+        """
+        Raises ValueError for anything that is not a complete replay.
+        """
+        headerSize = struct.calcsize(headerFormat)
+        if len(data) < headerSize:
+            raise ValueError("Replay header is truncated")
+        magic, version, seed, rate, ticks, score, nameLength = struct.unpack(
+            headerFormat, data[:headerSize]
+        )
+        if magic != replayMagic or version != replayVersion:
+            raise ValueError("Not an InfernoGame replay (or unknown version)")
+        offset = headerSize + nameLength
+        name = data[headerSize:offset].decode("utf-8", "replace")
+
+        runs = data[offset:]
+        if len(runs) % struct.calcsize(runFormat):
+            raise ValueError("Replay input log is truncated")
+        inputs = bytearray()
+        for actions, length in struct.iter_unpack(runFormat, runs):
+            inputs.extend(bytes((actions,)) * length)
+        if len(inputs) != ticks:
+            raise ValueError("Replay input log is truncated")
+        return cls(seed, inputs, score, name, rate)
+
+    def save(self, filePath):
+        # Write next to the target and rename, so a crash never leaves
+        # half a replay behind.
+        os.makedirs(os.path.dirname(filePath), exist_ok=True)
+        tempPath = filePath + ".tmp"
+        with open(tempPath, "wb") as f:
+            f.write(self.toBytes())
+        os.replace(tempPath, filePath)
+
+    @classmethod
+    def load(cls, filePath):
+        with open(filePath, "rb") as f:
+            return cls.fromBytes(f.read())
+
+
+def simulateReplay(game, replay):
+    """
+    Re-plays 'replay' headlessly on 'game' and returns the resulting score.
+    """
+    if replay.tickRate != tickRate:
+        raise ValueError(
+            f"Replay recorded at {replay.tickRate} ticks/s, "
+            f"game runs at {tickRate}"
+        )
+    game.inputSource = ScriptedInput(replay.inputs)
+    return game.runHeadless(len(replay.inputs), replay.seed)
+
+
+def runResult(game):
+    return int(game.score), game.ticks, game.deathCause
+
+
+def selfTest(seeds=range(20), maxTicks=tickRate * 60 * 2):
+    """
+    Records a headless ClimberInput run per seed and checks that its
+    replay survives encoding, that re-simulating it gives the same score,
+    tick count and cause of death, and that the vectorized entity store
+    plays it the same as per-sprite updates. Every seed is played with
+    the normal difficulty tiers and with every enemy kind from the start,
+    which exercises the hazard code. Returns the failures.
+    """
+    from main import InfernoGame
+    from entities import EntityStore, entityStoreAvailable
+
+    recorder = InfernoGame(headless=True)
+    players = {"sprites": InfernoGame(headless=True, assetSource=recorder)}
+    players["sprites"].entityStore = None
+    if entityStoreAvailable():
+        storeGame = InfernoGame(headless=True, assetSource=recorder)
+        storeGame.entityStore = EntityStore(storeGame)
+        players["entityStore"] = storeGame
+    games = [recorder] + list(players.values())
+    tierSettings = (recorder.difficultyTiers, (0, 0, 0))
+
+    failures = []
+    for seed, tiers in itertools.product(seeds, tierSettings):
+        run = f"seed {seed}, tiers {tiers}"
+        for game in games:
+            game.difficultyTiers = tiers
+        recorder.inputSource = ClimberInput(recorder, seed)
+        recorder.runHeadless(maxTicks, seed)
+        expected = runResult(recorder)
+        replay = Replay.fromGame(recorder, "selftest")
+
+        data = replay.toBytes()
+        decoded = Replay.fromBytes(data)
+        if (decoded.seed, decoded.inputs, decoded.score) != (
+                replay.seed, replay.inputs, replay.score):
+            failures.append(f"{run}: encoding round trip differs")
+        for cut in (1, len(data) // 2, len(data) - 1):
+            try:
+                Replay.fromBytes(data[:cut])
+            except ValueError:
+                continue
+            failures.append(f"{run}: {cut} bytes were accepted")
+
+        for name, game in players.items():
+            simulateReplay(game, decoded)
+            result = runResult(game)
+            if result != expected:
+                failures.append(
+                    f"{run} ({name}): recorded {expected}, "
+                    f"replayed {result}"
+                )
+    return failures
+
+
+def verifyHighScores(game, store):
+    """
+    Re-simulates every stored run that has a replay.
+    Returns a list of (entry, simulated score or None, message).
+    """
+    results = []
+    for entry in store.runsWithReplays():
+        replayPath = os.path.join(replaysFolder, entry["replay"])
+        try:
+            simulated = simulateReplay(game, Replay.load(replayPath))
+        except (IOError, ValueError, struct.error) as e:
+            results.append((entry, None, str(e)))
+            continue
+        status = "OK" if simulated == entry["score"] else "MISMATCH"
+        results.append((entry, simulated, status))
+    return results
+
+
+def main():
+    from main import InfernoGame
+    from scores import ScoreStore
+
+    start = time.perf_counter()
+    if sys.argv[1:] == ["--selftest"]:
+        failures = selfTest()
+        for failure in failures:
+            print(failure)
+        print(f"{'FAILED' if failures else 'OK'} in "
+              f"{time.perf_counter() - start:.2f}s")
+        sys.exit(1 if failures else 0)
+
+    game = InfernoGame(headless=True)
+    if len(sys.argv) > 1:
+        replay = Replay.load(sys.argv[1])
+        score = simulateReplay(game, replay)
+        print(f"{replay.name}: recorded {replay.score}, simulated {score} "
+              f"({len(replay.inputs)} ticks)")
+    else:
+        store = ScoreStore()
+        results = verifyHighScores(game, store)
+        store.close()
+        if not results:
+            print("No high scores with replays found.")
+        for entry, simulated, status in results:
+            print(f"{entry['name']:<16} stored {entry['score']:>5}  "
+                  f"simulated {simulated}  {status}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
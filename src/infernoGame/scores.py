@@ -0,0 +1,239 @@
+"""
+High-score storage for InfernoGame.
+Every finished run is kept in a SQLite database. Writes happen on a
+background thread in batched transactions, so the game-over screen never
+waits for the disk, and a crash can only lose the runs that were still
+queued, never corrupt the ones already stored. Indexes keep the top-N and
+per-player queries fast with millions of runs.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from settings import highScoreDatabase, highScoreFile, leaderboardSize
+from settings import replaysFolder
+
+schemaVersion = 1
+
+schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    seed INTEGER,
+    ticks INTEGER,
+    replay TEXT,
+    createdAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runsByScore ON runs (score DESC, id);
+CREATE INDEX IF NOT EXISTS runsByName ON runs (name, score DESC);
+"""
+
+
+class ScoreStore:
+    """
+    Leaderboard backed by SQLite.
+
+    record() only queues the run; the writer thread (started on first
+    use) saves its replay file and inserts it. Queries run on the
+    caller's thread through a separate read connection, which WAL mode
+    lets proceed while the writer commits.
+    """
+
+    insertSql = (
+        "INSERT INTO runs (name, score, seed, ticks, replay, createdAt) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+
+    def __init__(self, path=highScoreDatabase, legacyPath=highScoreFile):
+        self.path = path
+        self.legacyPath = legacyPath
+        self.pending = queue.Queue()
+        self.writer = None
+        self.reader = None
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        self.prepare(connection)
+        return connection
+
+    def prepare(self, connection):
+        """
+        Creates the schema and imports the old JSON leaderboard, once.
+        """
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version >= schemaVersion:
+                return
+            for statement in schema.split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+            connection.executemany(
+                self.insertSql,
+                [self.toRow(entry) for entry in self.loadLegacy()]
+            )
+            connection.execute(f"PRAGMA user_version = {schemaVersion}")
+
+    def loadLegacy(self):
+        if not os.path.exists(self.legacyPath):
+            return []
+        try:
+            with open(self.legacyPath, "r") as f:
+                entries = json.load(f)
+        except (ValueError, IOError) as e:
+            print(f"Could not import {self.legacyPath}: {e}")
+            return []
+        if not isinstance(entries, list):
+            print(f"Could not import {self.legacyPath}: expected a list")
+            return []
+        modified = os.path.getmtime(self.legacyPath)
+        valid = []
+        for entry in entries:
+            if not self.isValidEntry(entry):
+                print(f"Skipping malformed high score in "
+                      f"{self.legacyPath}: {entry!r}")
+                continue
+            entry.setdefault("createdAt", modified)
+            valid.append(entry)
+        return valid
+
+    @staticmethod
+    def isValidEntry(entry):
+        """
+        True for a {"name": str, "score": number, ...} entry whose
+        optional fields have the types toRow() stores.
+        """
+        if not isinstance(entry, dict):
+            return False
+        if not isinstance(entry.get("name"), str):
+            return False
+        optional = {
+            "seed": int, "ticks": int, "replay": str,
+            "createdAt": (int, float),
+        }
+        for key, types in optional.items():
+            value = entry.get(key)
+            if value is not None and (
+                    isinstance(value, bool) or not isinstance(value, types)):
+                return False
+        score = entry.get("score")
+        return isinstance(score, (int, float)) and not isinstance(score, bool)
+
+    @staticmethod
+    def toRow(entry):
+        return (
+            entry["name"], int(entry["score"]), entry.get("seed"),
+            entry.get("ticks"), entry.get("replay"),
+            entry.get("createdAt", time.time())
+        )
+
+    # --- Writing ---
+
+    def record(self, entry, replay=None):
+        """
+        Queues a finished run (and its Replay, if it should be kept).
+        Returns immediately.
+        """
+        if self.writer is None:
+            self.writer = threading.Thread(
+                target=self.writeLoop, name="ScoreStoreWriter", daemon=True
+            )
+            self.writer.start()
+        self.pending.put((entry, replay))
+
+    def writeLoop(self):
+        connection = self.connect()
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                entry, replay = item
+                if replay is not None:
+                    try:
+                        replay.save(
+                            os.path.join(replaysFolder, entry["replay"])
+                        )
+                    except IOError:
+                        print("Error saving replay.")
+                        entry["replay"] = None
+                rows.append(self.toRow(entry))
+            try:
+                with connection:
+                    connection.executemany(self.insertSql, rows)
+            except sqlite3.Error as e:
+                print(f"Error saving high scores: {e}")
+            for _ in batch:
+                self.pending.task_done()
+        connection.close()
+
+    def flush(self):
+        """
+        Blocks until every queued run is stored.
+        """
+        self.pending.join()
+
+    def close(self):
+        if self.writer is not None:
+            self.pending.put(None)
+            self.writer.join()
+            self.writer = None
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    # --- Queries ---
+
+    def query(self, sql, parameters=()):
+        if self.reader is None:
+            self.reader = self.connect()
+        rows = self.reader.execute(sql, parameters).fetchall()
+        return [dict(row) for row in rows]
+
+    def topScores(self, limit=leaderboardSize):
+        return self.query(
+            "SELECT name, score, seed, ticks, replay, createdAt FROM runs "
+            "ORDER BY score DESC, id LIMIT ?", (limit,)
+        )
+
+    def bestPerPlayer(self, limit=leaderboardSize):
+        """
+        Each player's best score, highest first.
+        """
+        return self.query(
+            "SELECT name, MAX(score) AS score, COUNT(*) AS runs FROM runs "
+            "GROUP BY name ORDER BY score DESC, name LIMIT ?", (limit,)
+        )
+
+    def playerBest(self, name):
+        rows = self.query(
+            "SELECT name, score, seed, ticks, replay, createdAt FROM runs "
+            "WHERE name = ? ORDER BY score DESC, id LIMIT 1", (name,)
+        )
+        return rows[0] if rows else None
+
+    def runsWithReplays(self):
+        return self.query(
+            "SELECT name, score, seed, ticks, replay, createdAt FROM runs "
+            "WHERE replay IS NOT NULL ORDER BY score DESC, id"
+        )
+
+    def count(self):
+        return self.query("SELECT COUNT(*) AS runs FROM runs")[0]["runs"]
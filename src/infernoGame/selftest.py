@@ -0,0 +1,91 @@
+"""
+Built-in checks for InfernoGame, run without a window.
+Covers what the game relies on but cannot see while playing: replays
+encode and re-simulate exactly (see replays.selfTest), live input
+reaches the player in the frame that pumped it, and keys held when a run
+ends do not carry into the next one.
+
+Usage: python selftest.py
+"""
+import sys
+import time
+
+import pygame
+
+from settings import tickRate
+from controls import KeyboardInput
+from main import InfernoGame
+from replays import selfTest as replaySelfTest
+
+
+def checkSameFrameInput(pressFrame=10, frames=20, seed=0):
+    """
+    Posts a jump key before frame 'pressFrame' of a live session and
+    returns the frames in which the player's jump() ran. The frame
+    before the press runs long, so the press frame runs at least one
+    tick.
+    """
+    jumpFrames = []
+
+    class ProbeGame(InfernoGame):
+        def handleEvents(self, now):
+            self.frame += 1
+            if self.frame == pressFrame:
+                pygame.event.post(pygame.event.Event(
+                    pygame.KEYDOWN, key=pygame.K_SPACE
+                ))
+            elif self.frame > frames:
+                self.isPlaying = False
+            super().handleEvents(now)
+            if self.frame == pressFrame - 1:
+                time.sleep(1.5 / tickRate)
+
+    game = ProbeGame(headless=True, inputSource=KeyboardInput())
+    game.frame = 0
+    game.setupGame(seed)
+    game.isPlaying = True
+    jump = game.player.jump
+
+    def recordJump():
+        jumpFrames.append(game.frame)
+        jump()
+
+    game.player.jump = recordJump
+    game.runSession()
+    return jumpFrames
+
+
+def checkHeldKeysReset(seed=0):
+    """
+    Holds a movement key into game over and returns what the keyboard
+    reports on the first tick of the next game.
+    """
+    keyboard = KeyboardInput()
+    game = InfernoGame(headless=True, inputSource=keyboard)
+    game.setupGame(seed)
+    keyboard.handleEvent(pygame.event.Event(
+        pygame.KEYDOWN, key=pygame.K_RIGHT
+    ))
+    game.setupGame(seed)
+    return keyboard.poll()
+
+
+def main():
+    start = time.perf_counter()
+    failures = replaySelfTest()
+    jumpFrames = checkSameFrameInput()
+    if jumpFrames != [10]:
+        failures.append(
+            f"jump pressed before frame 10 ran in frames {jumpFrames}"
+        )
+    if checkHeldKeysReset():
+        failures.append("a key held at game over is still held next game")
+    for failure in failures:
+        print(failure)
+    print(f"{'FAILED' if failures else 'OK'} in "
+          f"{time.perf_counter() - start:.2f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
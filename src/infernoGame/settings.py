@@ -7,7 +7,65 @@ import os
 # --- Screen Dimensions ---
 screenWidth = 1600
 screenHeight = 1000
-frameRate = 60
+frameRate = 60  # Default render frame cap, presets may lower it
+
+# --- Profiler Overlay (toggle with F3, export with F4) ---
+profilerHistory = 120  # Frames shown in the rolling graph
+profilerOverlayRefresh = 15  # Frames between overlay number updates
+# Latest frames kept for export, recorded only while the overlay is shown
+# or profilerExportFormat is set
+profilerMaxRecords = frameRate * 60 * 5
+profilerFontSize = 20
+profilerGraphHeight = 80
+profilerExportFormat = None  # "csv" or "json" to export after every run
+inputLatencyHistory = 240  # Input events kept for the latency statistics
+
+# --- Simulation Timing ---
+# The simulation advances in fixed ticks, independent of the render rate.
+tickRate = 60
+maxCatchUpSteps = 5  # Ticks run in one frame before the backlog is dropped
+# Speeds and gravity below are expressed per tick at this rate
+baseTickRate = 60
+tickScale = baseTickRate / tickRate
+
+# --- Rendering ---
+# Dirty rectangles only update the parts of the screen that changed.
+# Only used at full render resolution (renderScale 1.0).
+useDirtyRendering = False
+
+# --- Performance Presets (presets.py) ---
+# renderScale: internal resolution as a share of the screen size, shown
+#     upscaled in the window
+# lavaBlending: draw the lava translucent (off: hard-edged and opaque)
+# drawBackground: draw the game background (off: plain black)
+# frameRate: render frame cap
+# particleBudget: most particles alive at once (0: no particles)
+performancePresets = {
+    "high": {
+        "renderScale": 1.0, "lavaBlending": True, "drawBackground": True,
+        "frameRate": 60, "particleBudget": 2000,
+    },
+    "medium": {
+        "renderScale": 0.75, "lavaBlending": True, "drawBackground": True,
+        "frameRate": 60, "particleBudget": 1000,
+    },
+    "low": {
+        "renderScale": 0.5, "lavaBlending": False, "drawBackground": False,
+        "frameRate": 30, "particleBudget": 250,
+    },
+}
+defaultPreset = "high"
+presetEnvVar = "INFERNO_PRESET"
+
+# --- Headless Simulation ---
+headlessMaxTicks = tickRate * 60 * 10  # Safety cap: 10 minutes of play
+
+# --- Training Environment (env.py) ---
+envFrameSkip = 1  # Ticks each action is held for
+envPlatformSlots = 5  # Nearest platforms in an observation
+envHazardSlots = 5  # Nearest hazards in an observation
+envHazardRange = 600  # Vertical reach of the hazards an observation sees
+envDeathPenalty = 5.0  # Reward lost when a run ends
 
 # --- Physics Constants ---
 gravityValue = 0.8
@@ -15,11 +73,52 @@ jumpStrength = -24
 playerSpeed = 9
 terminalVelocity = 12  # MAX falling speed
 
+# --- Input Forgiveness (in ticks) ---
+# A jump pressed this long before landing still happens on landing
+jumpBufferTicks = round(0.1 * tickRate)
+# After walking off an edge the player can still jump for this long
+coyoteTicks = round(0.1 * tickRate)
+
 # --- Platform Generation Settings ---
 maxPlatforms = 10
 platformMinW = 300
 platformMaxW = 600
 platformHeight = 80  # Thickness
+# Platforms repeat the middle of their texture between two fixed end caps
+platformCapWidth = 32
+
+# Platforms are planned ahead in chunks during idle frame time
+levelChunkSize = 8
+levelLookahead = 16  # Plans kept ready ahead of the camera
+levelMaxRetries = 20  # Unreachable candidates rolled again per platform
+levelIdleMargin = 0.002  # Seconds of each frame left to the frame limiter
+
+# Height of the vertical buckets used by the collision index
+spatialCellSize = 200
+
+# Hazards further than this above or below the view sleep (no movement,
+# no shots) until the camera comes near again
+activeMargin = 400
+
+# Free sprites kept per pool for reuse (platforms, enemies, projectiles)
+spritePoolCapacity = 64
+
+# Step hazards in NumPy batches instead of one update() per sprite.
+# Pays off with a few dozen hazards or more. Needs numpy; the game falls
+# back to per-sprite updates without it.
+useEntityStore = False
+entityStoreCapacity = 256  # Initial rows, the store grows when full
+
+# --- Particles (particles.py) ---
+# Share of the budget after which new particles are thinned out
+particleSoftLimit = 0.75
+particleFadeSteps = 8  # Pre-rendered fade images per particle kind
+landingDustSpeed = 6  # Falling speed from which a landing raises dust
+landingDustCount = 12
+hitSparkCount = 40
+# Seconds the last frame stays up after a death while the particles
+# play out, before the game-over screen
+deathDelay = 0.5
 
 # --- Separation Settings ---
 platformMinYGap = 220
@@ -28,20 +127,39 @@ maxJumpDistance = 600
 
 # --- Lava Settings ---
 lavaRiseSpeed = 5
+lavaStartDepth = 500  # Pixels below the screen where the lava starts
+lavaCrestHeight = 80  # Height of the flames drawn above the lava surface
+lavaEmberRate = 0.6  # Embers per tick rising off the visible surface
+
+# --- Enemy Settings ---
+rangedShootDelay = 2 * tickRate  # Ticks between shots (2 seconds)
 
 # --- Difficulty Thresholds (Score) ---
 difficultyTier1 = 5
 difficultyTier2 = 12
 difficultyTier3 = 20
 
+# Chance of each enemy on a new platform, per tier (index 0 = below tier
+# 1). One roll per platform, checked against the chances in order.
+spawnChances = (
+    {},
+    {"spike": 0.5},  # Phase 1: Spikes Only
+    {"spike": 0.3, "patrol": 0.3},  # Phase 2: Spikes + Patrol
+    {"spike": 0.2, "patrol": 0.3, "ranged": 0.3},  # Phase 3: Total Chaos
+)
+
 # --- Color Definitions (RGB) ---
 colorBlack = (0, 0, 0)
+colorKeyLava = (255, 0, 255)  # Transparent parts of the unblended lava
 colorWhite = (255, 255, 255)
 colorLava = (255, 69, 0)
 colorPlayer = (0, 255, 0)
 colorPlatform = (0, 255, 255)
 colorSecondaryText = (200, 200, 200)
 colorAccent = (255, 215, 0)
+colorEmber = (255, 140, 20)
+colorDust = (170, 150, 130)
+colorSpark = (255, 240, 160)
 
 # Enemy Colors
 colorSpike = (150, 150, 150)
@@ -54,14 +172,23 @@ fontName = 'arial'
 fontSizeTitle = 90
 fontSizeSubtitle = 54
 fontSizeText = 36
+textCacheSize = 128  # Rendered text surfaces kept in the LRU cache
 
 # --- File Settings ---
 baseDir = os.path.dirname(__file__)
-highScoreFile = os.path.join(baseDir, "highscores.json")
+highScoreDatabase = os.path.join(baseDir, "highscores.db")
+highScoreFile = os.path.join(baseDir, "highscores.json")  # Imported once
+leaderboardSize = 5  # Entries on the start screen, replays are kept for them
+replaysFolder = os.path.join(baseDir, "replays")
+profilesFolder = os.path.join(baseDir, "profiles")
+presetFile = os.path.join(baseDir, "performance.json")
 
 # --- Asset Paths Configuration ---
 assetsFolder = os.path.join(baseDir, "assets")
 imagesFolder = os.path.join(assetsFolder, "images")
+# Decoded and pre-scaled images, rebuilt when a source file changes
+useAssetCache = True
+assetCacheFolder = os.path.join(assetsFolder, ".cache")
 
 bgStartImage = os.path.join(imagesFolder, "bg_start.png")
 bgGameImage = os.path.join(imagesFolder, "bg_game.png")
@@ -75,3 +202,12 @@ spikeImage = os.path.join(imagesFolder, "spike.png")
 enemyPatrolImage = os.path.join(imagesFolder, "enemy_patrol.png")
 enemyRangedImage = os.path.join(imagesFolder, "enemy_ranged.png")
 projectileImage = os.path.join(imagesFolder, "projectile.png")
+
+# Player animation strips: one image per frame, played in order
+playerWalkImages = [playerImage]
+playerJumpImages = [playerJumpImage]
+playerFrameTicks = 8  # Ticks each animation frame stays on screen
+
+# Optional parallax layers over the game background: (image path, factor)
+# A factor of 0.5 scrolls the layer at half the camera speed.
+bgParallaxLayers = []
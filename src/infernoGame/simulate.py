@@ -0,0 +1,45 @@
+"""
+Headless simulation runner for InfernoGame.
+Plays many sessions back to back without a window, driven by a bot,
+for balancing and regression checks.
+
+Usage: python simulate.py [runs] [maxTicks]
+"""
+import sys
+import time
+
+from settings import headlessMaxTicks
+from controls import RandomInput
+from main import InfernoGame
+
+
+def simulateRuns(runs, maxTicks=headlessMaxTicks, seed=0):
+    """
+    Runs 'runs' headless sessions and returns the list of final scores.
+    Run i uses seed + i for both the level and the bot, so the same
+    arguments always give the same scores.
+    """
+    game = InfernoGame(headless=True)
+    scores = []
+    for runIndex in range(runs):
+        game.inputSource = RandomInput(seed + runIndex)
+        scores.append(game.runHeadless(maxTicks, seed + runIndex))
+    return scores
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    maxTicks = int(sys.argv[2]) if len(sys.argv) > 2 else headlessMaxTicks
+
+    start = time.perf_counter()
+    scores = simulateRuns(runs, maxTicks)
+    elapsed = time.perf_counter() - start
+
+    print(f"Runs: {runs} in {elapsed:.2f}s "
+          f"({runs / elapsed * 60:.0f} runs/min)")
+    print(f"Score min/avg/max: {min(scores)} / "
+          f"{sum(scores) / len(scores):.1f} / {max(scores)}")
+
+
+if __name__ == "__main__":
+    main()
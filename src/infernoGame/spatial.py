@@ -0,0 +1,85 @@
+"""
+Spatial indexing for InfernoGame.
+The level is a vertical strip, so sprites are bucketed into horizontal
+bands by their y position. Collision checks only look at the bands that
+overlap the player instead of every sprite in the group.
+"""
+import pygame
+
+from settings import spatialCellSize
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """
+    Sprite group that keeps a vertical bucket grid of its members.
+
+    A sprite is indexed when it is added, using its rect at that moment.
+    Members may move freely on the x axis but keep their y: positions are
+    world coordinates, and scrolling only moves the camera.
+    """
+
+    def __init__(self, *sprites, cellSize=spatialCellSize):
+        self.cellSize = cellSize
+        self.buckets = {}
+        self.spriteCells = {}
+        super().__init__(*sprites)
+
+    def cellRange(self, rect):
+        first = rect.top // self.cellSize
+        last = (rect.bottom - 1) // self.cellSize
+        return first, max(first, last)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        first, last = self.cellRange(sprite.rect)
+        self.spriteCells[sprite] = (first, last)
+        for cell in range(first, last + 1):
+            self.buckets.setdefault(cell, {})[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        first, last = self.spriteCells.pop(sprite)
+        for cell in range(first, last + 1):
+            bucket = self.buckets[cell]
+            del bucket[sprite]
+            if not bucket:
+                del self.buckets[cell]
+
+    def query(self, rect):
+        """
+        Broad phase: returns the members whose rect overlaps 'rect'.
+        """
+        first, last = self.cellRange(rect)
+        buckets = self.buckets
+        if first == last:
+            candidates = buckets.get(first, ())
+        else:
+            candidates = {}
+            for cell in range(first, last + 1):
+                bucket = buckets.get(cell)
+                if bucket:
+                    candidates.update(bucket)
+        colliderect = rect.colliderect
+        return [sprite for sprite in candidates if colliderect(sprite.rect)]
+
+    def collideMask(self, sprite):
+        """
+        Broad phase on rects, then pixel-perfect masks on the candidates.
+        """
+        collide = pygame.sprite.collide_mask
+        return [
+            other for other in self.query(sprite.rect)
+            if collide(sprite, other)
+        ]
+
+    def below(self, y):
+        """
+        Returns the members whose top edge is at or below 'y' (for
+        example everything the camera has left behind).
+        """
+        first = y // self.cellSize
+        found = {}
+        for cell, bucket in self.buckets.items():
+            if cell >= first:
+                found.update(bucket)
+        return [sprite for sprite in found if sprite.rect.top >= y]
@@ -1,6 +1,7 @@
-import random
 import pygame
 from settings import *
+from controls import INPUT_NONE, INPUT_LEFT, INPUT_RIGHT
+from prototypes import trim_image
 
 # Layer Constants
 LAYER_PLATFORM = 1
@@ -8,321 +9,519 @@ LAYER_ENTITIES = 2
 LAYER_LAVA = 3
 
 
-def trim_image(img, min_height=10):
+def step_pixels(distance, remainder):
     """
-    Automatic cropping: Removes transparent margins.
-    Safety: Prevents creating rects too small for physics.
+    Splits a fractional move into the whole pixels to apply this tick and
+    the fraction carried over to the next one, so slow speeds at high tick
+    rates are not lost to rect rounding.
     """
-    try:
-        rect = img.get_bounding_rect()
-        if rect.height < min_height:
-            return img
-        return img.subsurface(rect).copy()
-    except ValueError:
-        return img
+    total = distance + remainder
+    whole = round(total)
+    return whole, total - whole
 
 
-class Player(pygame.sprite.Sprite):
+class Player(pygame.sprite.DirtySprite):
     def __init__(self, game):
         self._layer = LAYER_ENTITIES
         super().__init__()
         self.game = game
 
-        if self.game.playerImg:
-            raw_walk = pygame.transform.scale(self.game.playerImg, (40, 50))
-            self.walk_img = trim_image(raw_walk)
-            self.walk_img.set_colorkey(colorBlack)
-        else:
-            self.walk_img = pygame.Surface((30, 40))
-            self.walk_img.fill(colorPlayer)
-
-        jump_img_source = getattr(self.game, 'playerJumpImg', None)
-        if jump_img_source:
-            raw_jump = pygame.transform.scale(jump_img_source, (40, 50))
-            self.jump_img = trim_image(raw_jump)
-            self.jump_img.set_colorkey(colorBlack)
-        else:
-            self.jump_img = self.walk_img.copy()
+        self.buildPoses()
+        self.animationTick = 0
+        self.currentPose = None
 
-        self.image = self.walk_img
+        self.image = self.poses[("walk", True)][0].image
         self.rect = self.image.get_rect()
         self.rect.center = (screenWidth // 2, screenHeight - 150)
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = self.poses[("walk", True)][0].mask
 
         self.velocityX = 0
         self.velocityY = 0
+        self.remainderX = 0.0
+        self.remainderY = 0.0
         self.onGround = False
+        # Ticks left in which a jump press / leaving the ground still count
+        self.jumpBuffer = 0
+        self.coyote = 0
         self.facingRight = True
+        self.controls = INPUT_NONE
+        # Moves every tick: always redrawn by the dirty renderer
+        self.dirty = 2
 
     def update(self):
         self.applyGravity()
         self.handleMovement()
         # Animation is handled in main.py
 
-        self.rect.x += self.velocityX
-        self.rect.y += self.velocityY
+        stepX, self.remainderX = step_pixels(
+            self.velocityX * tickScale, self.remainderX
+        )
+        stepY, self.remainderY = step_pixels(
+            self.velocityY * tickScale, self.remainderY
+        )
+        self.rect.x += stepX
+        self.rect.y += stepY
 
         if self.rect.right > screenWidth:
             self.rect.left = 0
         if self.rect.left < 0:
             self.rect.right = screenWidth
 
-    def animate(self):
-        previous_bottom = self.rect.bottom
-        previous_center_x = self.rect.centerx
+    def buildPoses(self):
+        """
+        Precomputes every (pose, facing) combination as a strip of
+        prototypes, so animate() only picks an existing image and mask.
+        A strip holds one prototype per animation frame.
+        """
+        walkFrames = self.game.playerWalkImgs or [None]
+        jumpFrames = self.game.playerJumpImgs
+        jumpAsset = "playerJump"
+        if not jumpFrames:
+            jumpFrames = walkFrames
+            jumpAsset = "playerWalk"
+
+        self.poses = {}
+        for pose, asset, frames in (("walk", "playerWalk", walkFrames),
+                                    ("jump", jumpAsset, jumpFrames)):
+            for facingRight in (True, False):
+                self.poses[(pose, facingRight)] = [
+                    self.game.prototypes.get(
+                        (asset, index), (40, 50), source, self.drawFallback,
+                        flipX=not facingRight, colorKey=colorBlack
+                    )
+                    for index, source in enumerate(frames)
+                ]
+
+    @staticmethod
+    def drawFallback():
+        image = pygame.Surface((30, 40))
+        image.fill(colorPlayer)
+        return image
 
-        if self.onGround:
-            current_img = self.walk_img
-        else:
-            current_img = self.jump_img
+    def animate(self):
+        pose = "walk" if self.onGround else "jump"
+        strip = self.poses[(pose, self.facingRight)]
+        frameIndex = (self.animationTick // playerFrameTicks) % len(strip)
+        self.animationTick += 1
 
-        if not self.facingRight:
-            current_img = pygame.transform.flip(current_img, True, False)
+        current = (pose, self.facingRight, frameIndex)
+        if current == self.currentPose:
+            return
+        self.currentPose = current
 
-        self.image = current_img
+        prototype = strip[frameIndex]
+        previous_bottom = self.rect.bottom
+        previous_center_x = self.rect.centerx
+        self.image = prototype.image
+        self.mask = prototype.mask
         self.rect = self.image.get_rect()
         self.rect.bottom = previous_bottom
         self.rect.centerx = previous_center_x
-        self.mask = pygame.mask.from_surface(self.image)
 
     def applyGravity(self):
-        self.velocityY += gravityValue
+        self.velocityY += gravityValue * tickScale
         if self.velocityY > terminalVelocity:
             self.velocityY = terminalVelocity
 
     def handleMovement(self):
+        # Controls are set by the game from its input source every tick
         self.velocityX = 0
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if self.controls & INPUT_LEFT:
             self.velocityX = -playerSpeed
             self.facingRight = False
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if self.controls & INPUT_RIGHT:
             self.velocityX = playerSpeed
             self.facingRight = True
 
     def jump(self):
+        """
+        Registers a jump press; applyJump() performs it this tick or, when
+        the player cannot jump yet, during the next jumpBufferTicks.
+        """
+        self.jumpBuffer = jumpBufferTicks + 1
+
+    def applyJump(self):
+        """
+        Runs once per tick before moving, while onGround still says
+        whether the player stood on something last tick. The ground stays
+        jumpable for coyoteTicks after it was left.
+        """
         if self.onGround:
+            self.coyote = coyoteTicks + 1
+        if self.jumpBuffer and self.coyote:
             self.velocityY = jumpStrength
             self.onGround = False
+            self.jumpBuffer = 0
+            self.coyote = 0
+            return
+        if self.jumpBuffer:
+            self.jumpBuffer -= 1
+        if self.coyote:
+            self.coyote -= 1
+
+
+class PooledSprite(pygame.sprite.DirtySprite):
+    """
+    Base for sprites recycled through a SpritePool: kill() hands the
+    sprite back to its pool and reset() prepares it for the next spawn.
+    """
+    pool = None
 
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class Platform(PooledSprite):
+    """
+    Platforms are drawn from one shared sliced texture. Live platforms of
+    the same size share one image, and a killed platform lets go of it,
+    so the pool keeps no pixels. Collisions only use the rect, so no mask
+    is built.
+    """
 
-class Platform(pygame.sprite.Sprite):
     def __init__(self, game, x, y, width, height):
         self._layer = LAYER_PLATFORM
         super().__init__()
         self.game = game
-        if self.game.platformImg:
-            self.image = pygame.transform.scale(
-                self.game.platformImg, (width, height)
-            )
-        else:
-            self.image = pygame.Surface((width, height))
-            self.image.fill(colorPlatform)
+        self.image = None
+        self.reset(game, x, y, width, height)
 
+    def reset(self, game, x, y, width, height):
+        self.image = game.prototypes.getShared(
+            ("platform", width, height),
+            lambda: self.drawImage(game, width, height)
+        )
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        self.mask = pygame.mask.from_surface(self.image)
-
+        self.dirty = 1
+        # Enemies standing on this platform, removed together with it
+        self.attachments = []
+
+    def drawImage(self, game, width, height):
+        if not game.platformImg:
+            image = pygame.Surface((width, height))
+            image.fill(colorPlatform)
+            return image
+        texture = game.prototypes.getSliced(
+            ("platformTexture", height),
+            lambda: self.buildTexture(game.platformImg, height),
+            platformCapWidth, game.platformImg
+        )
+        image = pygame.Surface((width, height), pygame.SRCALPHA)
+        texture.draw(image)
+        return image
+
+    @staticmethod
+    def buildTexture(source, height):
+        """
+        Scales the platform art to 'height' keeping its proportions and
+        crops the transparent margins at both ends.
+        """
+        width = round(source.get_width() * height / source.get_height())
+        texture = pygame.transform.smoothscale(source, (width, height))
+        bounds = texture.get_bounding_rect()
+        return texture.subsurface(
+            (bounds.left, 0, bounds.width, height)
+        ).copy()
+
+    def attach(self, sprite):
+        self.attachments.append(sprite)
+
+    def detach(self, sprite):
+        if sprite in self.attachments:
+            self.attachments.remove(sprite)
+
+    def kill(self):
+        for sprite in self.attachments[:]:
+            sprite.kill()
+        super().kill()
+        self.image = None
+
+
+class Lava(pygame.sprite.DirtySprite):
+    """
+    Rising lava plane. Its top edge is a flat line, so collisions are a
+    height test and the image is a single screen-sized tiled strip that
+    only gets drawn where it overlaps the screen.
+    """
 
-class Lava(pygame.sprite.Sprite):
     def __init__(self, game):
         self._layer = LAYER_LAVA
         super().__init__()
         self.game = game
+        self.image = self.game.prototypes.getSurface(
+            ("lavaStrip", screenWidth, screenHeight, game.lavaBlending),
+            self.buildStrip, self.game.lavaImg
+        )
+        self.rect = self.image.get_rect()
+        self.rect.top = game.cameraBottom() + lavaStartDepth
+        self.remainder = 0.0
+        self.emberCarry = 0.0
+        self.dirty = 2
+
+    def buildStrip(self):
+        strip = pygame.Surface((screenWidth, screenHeight), pygame.SRCALPHA)
         if self.game.lavaImg:
-            self.image = pygame.transform.scale(
+            # Scale as the full-height lava used to be, keep the opaque band
+            # and repeat it down to the bottom of the strip.
+            tile = trim_image(pygame.transform.scale(
                 self.game.lavaImg, (screenWidth, screenHeight * 2)
-            )
-            self.image.set_alpha(220)
+            ))
+            for y in range(0, screenHeight, tile.get_height()):
+                strip.blit(tile, (0, y))
+            alpha = 220
         else:
-            self.image = pygame.Surface((screenWidth, screenHeight * 2))
-            self.image.fill(colorLava)
-            self.image.set_alpha(200)
-
-        self.rect = self.image.get_rect()
-        self.rect.top = screenHeight
-        self.mask = pygame.mask.from_surface(self.image)
+            strip.fill(colorLava)
+            alpha = 200
+        if self.game.lavaBlending:
+            strip.set_alpha(alpha)
+            return strip
+        # Opaque with a color key: mostly transparent pixels are dropped,
+        # everything else is drawn without blending.
+        flat = pygame.mask.from_surface(strip, 127).to_surface(
+            setsurface=strip, unsetcolor=colorKeyLava
+        ).convert()
+        flat.set_colorkey(colorKeyLava, pygame.RLEACCEL)
+        return flat
 
     def update(self):
-        self.rect.y -= lavaRiseSpeed
-        if self.rect.top > screenHeight:
-            self.rect.top = screenHeight
+        step, self.remainder = step_pixels(
+            self.game.lavaRiseSpeed * tickScale, self.remainder
+        )
+        self.rect.y -= step
+        self.clampDepth()
+        self.emitEmbers()
+
+    def emitEmbers(self):
+        """
+        Embers rise from the flames while the surface is on screen.
+        Fractional rates carry over to the next tick.
+        """
+        surface = self.rect.top + lavaCrestHeight
+        if surface > self.game.cameraBottom():
+            return
+        self.emberCarry += lavaEmberRate * tickScale
+        count = int(self.emberCarry)
+        if count:
+            self.emberCarry -= count
+            self.game.particles.emit(
+                "ember", screenWidth / 2, surface - lavaCrestHeight / 2,
+                count, screenWidth / 2, lavaCrestHeight / 2
+            )
+
+    def clampDepth(self):
+        """
+        The lava never falls further below the camera than its starting
+        depth.
+        """
+        deepest = self.game.cameraBottom() + lavaStartDepth
+        if self.rect.top > deepest:
+            self.rect.top = deepest
+
+    def collidesWith(self, sprite):
+        # The flames on top are decoration, the surface is below them
+        return sprite.rect.bottom > self.rect.top + lavaCrestHeight
 
 
 # --- ENEMIES ---
 
-class Spike(pygame.sprite.Sprite):
+class AttachedEnemy(PooledSprite):
+    """
+    Base for enemies that stand on a platform and die with it.
+    Platforms never move, so an enemy placed on one stays on it and is
+    culled together with it.
+    """
+
+    def attachTo(self, platform):
+        self.platform = platform
+        platform.attach(self)
+
+    def kill(self):
+        self.platform.detach(self)
+        super().kill()
+
+
+class Spike(AttachedEnemy):
+    hazardName = "spike"
+
     def __init__(self, game, platform):
         self._layer = LAYER_ENTITIES
         super().__init__()
         self.game = game
-        self.platform = platform
-
-        if self.game.spikeImg:
-            # SIZE: (180, 135)
-            raw_img = pygame.transform.scale(self.game.spikeImg, (180, 135))
-            self.image = trim_image(raw_img)
-        else:
-            self.image = pygame.Surface((180, 135), pygame.SRCALPHA)
-            pygame.draw.polygon(
-                self.image, colorSpike, [(0, 135), (90, 0), (180, 135)]
-            )
 
+        # SIZE: (180, 135)
+        prototype = self.game.prototypes.get(
+            "spike", (180, 135), self.game.spikeImg, self.drawFallback
+        )
+        self.image = prototype.image
+        self.mask = prototype.mask
         self.rect = self.image.get_rect()
-        self.mask = pygame.mask.from_surface(self.image)
+        self.reset(game, platform)
 
+    def reset(self, game, platform):
+        self.attachTo(platform)
         maxOffset = platform.rect.width - self.rect.width
         if maxOffset > 0:
-            offset = random.randint(0, int(maxOffset))
+            offset = self.game.rng.randint(0, int(maxOffset))
         else:
             offset = 0
 
         # VISUAL FIX: Overlap +35 pixels
         self.rect.bottom = platform.rect.top + 35
         self.rect.x = platform.rect.x + offset
+        self.dirty = 1
 
-    def update(self):
-        if not self.platform.alive():
-            self.kill()
-            return
-
-        self.rect.bottom = self.platform.rect.top + 35
-        self.rect.x = max(
-            self.platform.rect.x,
-            min(self.rect.x, self.platform.rect.right - self.rect.width)
+    @staticmethod
+    def drawFallback():
+        image = pygame.Surface((180, 135), pygame.SRCALPHA)
+        pygame.draw.polygon(
+            image, colorSpike, [(0, 135), (90, 0), (180, 135)]
         )
-        if self.rect.top >= screenHeight:
-            self.kill()
+        return image
+
 
+class PatrolEnemy(AttachedEnemy):
+    hazardName = "patrol"
 
-class PatrolEnemy(pygame.sprite.Sprite):
     def __init__(self, game, platform):
         self._layer = LAYER_ENTITIES
         super().__init__()
         self.game = game
-        self.platform = platform
-
-        if self.game.enemyPatrolImg:
-            # SIZE: (100, 100)
-            raw_img = pygame.transform.scale(
-                self.game.enemyPatrolImg, (100, 100)
-            )
-            self.image = trim_image(raw_img)
-        else:
-            self.image = pygame.Surface((100, 100))
-            self.image.fill(colorEnemyPatrol)
 
+        # SIZE: (100, 100)
+        prototype = self.game.prototypes.get(
+            "enemyPatrol", (100, 100), self.game.enemyPatrolImg,
+            self.drawFallback
+        )
+        self.image = prototype.image
+        self.mask = prototype.mask
         self.rect = self.image.get_rect()
-        self.mask = pygame.mask.from_surface(self.image)
+        self.speed = 3
+        self.dirty = 2
+        self.reset(game, platform)
 
+    def reset(self, game, platform):
+        self.attachTo(platform)
         # VISUAL FIX: +35 pixels overlap
         self.rect.bottom = platform.rect.top + 35
         self.rect.centerx = platform.rect.centerx
-
-        self.speed = 3
         self.direction = 1
+        self.remainder = 0.0
 
-    def update(self):
-        if not self.platform.alive():
-            self.kill()
-            return
+    @staticmethod
+    def drawFallback():
+        image = pygame.Surface((100, 100))
+        image.fill(colorEnemyPatrol)
+        return image
 
-        self.rect.x += self.speed * self.direction
+    def update(self):
+        step, self.remainder = step_pixels(
+            self.speed * self.direction * tickScale, self.remainder
+        )
+        self.rect.x += step
         if self.rect.right > self.platform.rect.right:
             self.direction = -1
         if self.rect.left < self.platform.rect.left:
             self.direction = 1
 
-        # Maintain overlap
-        self.rect.bottom = self.platform.rect.top + 35
-
-        if self.rect.top >= screenHeight:
-            self.kill()
 
+class RangedEnemy(AttachedEnemy):
+    hazardName = "ranged"
 
-class RangedEnemy(pygame.sprite.Sprite):
     def __init__(self, game, platform):
         self._layer = LAYER_ENTITIES
         super().__init__()
         self.game = game
-        self.platform = platform
-
-        if self.game.enemyRangedImg:
-            raw_img = pygame.transform.scale(
-                self.game.enemyRangedImg, (80, 120)
-            )
-            self.image = trim_image(raw_img)
-        else:
-            self.image = pygame.Surface((80, 120))
-            self.image.fill(colorEnemyRanged)
 
+        prototype = self.game.prototypes.get(
+            "enemyRanged", (80, 120), self.game.enemyRangedImg,
+            self.drawFallback
+        )
+        self.image = prototype.image
+        self.mask = prototype.mask
         self.rect = self.image.get_rect()
-        self.mask = pygame.mask.from_surface(self.image)
+        self.shootDelay = rangedShootDelay
+        self.reset(game, platform)
 
+    def reset(self, game, platform):
+        self.attachTo(platform)
         # VISUAL FIX: +35 pixels overlap
         self.rect.bottom = platform.rect.top + 35
 
         # POSITION FIX: Move inwards from edges
         margin = platform.rect.width // 6
 
-        if random.choice([True, False]):
+        if self.game.rng.choice([True, False]):
             self.rect.centerx = platform.rect.left + margin
             self.shootDir = 1
         else:
             self.rect.centerx = platform.rect.right - margin
             self.shootDir = -1
 
-        self.lastShot = pygame.time.get_ticks()
-        self.shootDelay = 2000
+        # Timers count simulation ticks, so replays fire at the same moments
+        self.lastShot = self.game.ticks
+        self.dirty = 1
 
-    def update(self):
-        if not self.platform.alive():
-            self.kill()
-            return
+    @staticmethod
+    def drawFallback():
+        image = pygame.Surface((80, 120))
+        image.fill(colorEnemyRanged)
+        return image
 
-        # Maintain overlap
-        self.rect.bottom = self.platform.rect.top + 35
-        now = pygame.time.get_ticks()
+    def update(self):
+        now = self.game.ticks
         if now - self.lastShot > self.shootDelay:
             self.lastShot = now
             self.shoot()
 
-        if self.rect.top >= screenHeight:
-            self.kill()
-
     def shoot(self):
-        p = Projectile(
+        p = self.game.pools[Projectile].acquire(
             self.game, self.rect.centerx, self.rect.centery, self.shootDir
         )
-        self.game.allSprites.add(p)
-        self.game.hazards.add(p)
+        self.game.addHazard(p)
+
 
+class Projectile(PooledSprite):
+    hazardName = "projectile"
 
-class Projectile(pygame.sprite.Sprite):
     def __init__(self, game, x, y, direction):
         self._layer = LAYER_ENTITIES
         super().__init__()
         self.game = game
-        self.speed = 6 * direction
-
-        if self.game.projectileImg:
-            raw_img = pygame.transform.scale(self.game.projectileImg, (40, 15))
-            self.image = trim_image(raw_img)
-        else:
-            self.image = pygame.Surface((20, 8))
-            self.image.fill(colorProjectile)
 
+        prototype = self.game.prototypes.get(
+            "projectile", (40, 15), self.game.projectileImg,
+            self.drawFallback
+        )
+        self.image = prototype.image
+        self.mask = prototype.mask
         self.rect = self.image.get_rect()
-        self.mask = pygame.mask.from_surface(self.image)
+        self.dirty = 2
+        self.reset(game, x, y, direction)
+
+    def reset(self, game, x, y, direction):
+        self.speed = 6 * direction
         self.rect.center = (x, y)
+        self.remainder = 0.0
+
+    @staticmethod
+    def drawFallback():
+        image = pygame.Surface((20, 8))
+        image.fill(colorProjectile)
+        return image
 
     def update(self):
-        self.rect.x += self.speed
+        step, self.remainder = step_pixels(
+            self.speed * tickScale, self.remainder
+        )
+        self.rect.x += step
         isOffScreen = (
             self.rect.right < 0 or
             self.rect.left > screenWidth or
-            self.rect.top > screenHeight
+            self.rect.top > self.game.cameraBottom()
         )
         if isOffScreen:
             self.kill()
@@ -0,0 +1,68 @@
+"""
+Font and rendered text caching for InfernoGame.
+Fonts are opened once per size and rendered strings are kept in an LRU
+cache, so unchanged text (HUD, menus, leaderboard) is only blitted.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from settings import fontName, textCacheSize
+
+
+class TextRenderer:
+    """
+    Renders text through a per-size font cache and an LRU cache of
+    surfaces keyed by (text, size, color).
+    """
+
+    def __init__(self, fontPath, capacity=textCacheSize):
+        self.fontPath = fontPath
+        self.capacity = capacity
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getFont(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            try:
+                font = pygame.font.Font(self.fontPath, size)
+            except TypeError:
+                font = pygame.font.SysFont(fontName, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """
+        Returns the rendered surface for 'text'. The surface is shared with
+        the cache, so callers must not draw on it.
+        """
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.getFont(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        return {
+            "fonts": len(self.fonts),
+            "surfaces": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,258 @@
+"""
+Parallel difficulty tuning for InfernoGame.
+Plays many seeded headless runs with a bot for every combination of a
+parameter grid, spread over a process pool, and reports score and
+survival-time distributions, causes of death and per-tier statistics.
+Every combination is played on the same seeds, so they compare directly.
+
+Grid keys: difficultyTier1/2/3, lavaRiseSpeed, maxPlatforms and
+spawn.<tier>.<enemy> (e.g. spawn.3.ranged) for the spawnChances table.
+
+Usage:
+    python tuning.py --runs 500
+    python tuning.py --grid lavaRiseSpeed=4,5,6 difficultyTier3=15,20,25
+    python tuning.py --grid spawn.3.ranged=0.2,0.4 --output sweep.json
+"""
+import argparse
+import copy
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import *
+from controls import ClimberInput, RandomInput
+from main import InfernoGame, enemyClasses
+from benchmark import percentile
+
+deathCauses = (
+    "lava", "spike", "patrol", "ranged", "projectile", "fall", "timeout"
+)
+gameTunables = ("lavaRiseSpeed", "maxPlatforms")
+tierTunables = ("difficultyTier1", "difficultyTier2", "difficultyTier3")
+
+# One headless game per worker process, reused for all its runs
+workerGame = None
+
+
+def parseValue(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parseGrid(items):
+    """
+    Turns ["key=v1,v2", ...] into a list of parameter dicts, one per
+    combination.
+    """
+    keys, valueLists = [], []
+    for item in items:
+        key, _, values = item.partition("=")
+        checkKey(key)
+        keys.append(key)
+        valueLists.append([parseValue(v) for v in values.split(",")])
+    return [dict(zip(keys, combo)) for combo in itertools.product(*valueLists)]
+
+
+def checkKey(key):
+    if key in gameTunables or key in tierTunables:
+        return
+    parts = key.split(".")
+    if (len(parts) == 3 and parts[0] == "spawn" and parts[1].isdigit() and
+            int(parts[1]) < len(spawnChances) and parts[2] in enemyClasses):
+        return
+    raise ValueError(f"Unknown tuning parameter: {key}")
+
+
+def applyParams(game, params):
+    """
+    Resets the game's balance knobs to the settings, then applies 'params'.
+    """
+    tiers = [difficultyTier1, difficultyTier2, difficultyTier3]
+    chances = copy.deepcopy(spawnChances)
+    game.lavaRiseSpeed = lavaRiseSpeed
+    game.maxPlatforms = maxPlatforms
+    for key, value in params.items():
+        if key in tierTunables:
+            tiers[tierTunables.index(key)] = value
+        elif key in gameTunables:
+            setattr(game, key, value)
+        else:
+            _, tier, name = key.split(".")
+            chances[int(tier)][name] = value
+    game.difficultyTiers = tuple(tiers)
+    game.spawnChances = chances
+
+
+def makePolicy(game, policy, seed):
+    if policy == "random":
+        return RandomInput(seed)
+    return ClimberInput(game, seed)
+
+
+def playRun(game, seed, maxTicks, policy):
+    """
+    Plays one run and returns what the report needs about it.
+    """
+    game.inputSource = makePolicy(game, policy, seed)
+    game.setupGame(seed)
+    game.isPlaying = True
+    tierTicks = [0] * len(game.spawnChances)
+    while game.isPlaying and game.ticks < maxTicks:
+        game.updateLogic()
+        tierTicks[game.difficultyTier()] += 1
+    return {
+        "seed": seed,
+        "score": int(game.score),
+        "ticks": game.ticks,
+        "cause": game.deathCause or "timeout",
+        "tier": game.difficultyTier(),
+        "tierTicks": tierTicks,
+    }
+
+
+def runChunk(task):
+    """
+    Worker entry point: plays 'seeds' with one parameter combination.
+    """
+    global workerGame
+    comboIndex, params, seeds, maxTicks, policy = task
+    if workerGame is None:
+        workerGame = InfernoGame(headless=True)
+    applyParams(workerGame, params)
+    return comboIndex, [
+        playRun(workerGame, seed, maxTicks, policy) for seed in seeds
+    ]
+
+
+def distribution(values):
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p10": percentile(ordered, 0.10),
+        "p50": percentile(ordered, 0.50),
+        "p90": percentile(ordered, 0.90),
+        "max": ordered[-1],
+    }
+
+
+def summarize(records):
+    runs = len(records)
+    causes = {cause: 0 for cause in deathCauses}
+    for record in records:
+        causes[record["cause"]] += 1
+
+    tiers = []
+    for tier in range(len(records[0]["tierTicks"])):
+        reached = [r for r in records if r["tierTicks"][tier]]
+        seconds = [r["tierTicks"][tier] / tickRate for r in reached]
+        tiers.append({
+            "reached": len(reached) / runs,
+            "died": sum(1 for r in records if r["tier"] == tier) / runs,
+            "meanSeconds": sum(seconds) / len(seconds) if seconds else 0.0,
+        })
+    return {
+        "runs": runs,
+        "score": distribution([r["score"] for r in records]),
+        "survivalSeconds": distribution(
+            [r["ticks"] / tickRate for r in records]
+        ),
+        "deaths": {cause: count / runs for cause, count in causes.items()},
+        "tiers": tiers,
+    }
+
+
+def printSummary(params, summary):
+    label = " ".join(f"{k}={v}" for k, v in params.items()) or "defaults"
+    score = summary["score"]
+    survival = summary["survivalSeconds"]
+    print(f"{label}  ({summary['runs']} runs)")
+    print(f"  score     mean {score['mean']:6.2f}  p10 {score['p10']:4}  "
+          f"p50 {score['p50']:4}  p90 {score['p90']:4}  max {score['max']}")
+    print(f"  survival  mean {survival['mean']:6.1f}s p10 "
+          f"{survival['p10']:5.1f}s p50 {survival['p50']:5.1f}s "
+          f"p90 {survival['p90']:5.1f}s")
+    deaths = "  ".join(
+        f"{cause} {share:.0%}" for cause, share in summary["deaths"].items()
+        if share
+    )
+    print(f"  deaths    {deaths}")
+    for tier, stats in enumerate(summary["tiers"]):
+        print(f"  tier {tier}    reached {stats['reached']:4.0%}  "
+              f"died here {stats['died']:4.0%}  "
+              f"{stats['meanSeconds']:5.1f}s spent")
+
+
+def runSweep(grid, runs, seed, maxTicks, policy, workers, chunkSize=25):
+    """
+    Plays 'runs' seeds for every combination in 'grid' and returns a list
+    of (params, summary) in grid order.
+    """
+    tasks = []
+    for comboIndex, params in enumerate(grid):
+        for start in range(seed, seed + runs, chunkSize):
+            seeds = range(start, min(start + chunkSize, seed + runs))
+            tasks.append((comboIndex, params, seeds, maxTicks, policy))
+
+    records = [[] for _ in grid]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for comboIndex, chunk in executor.map(runChunk, tasks):
+            records[comboIndex].extend(chunk)
+    return [
+        (params, summarize(comboRecords))
+        for params, comboRecords in zip(grid, records)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=200,
+                        help="seeded runs per parameter combination")
+    parser.add_argument("--grid", nargs="*", default=[],
+                        metavar="KEY=V1,V2")
+    parser.add_argument("--policy", choices=("climber", "random"),
+                        default="climber")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=headlessMaxTicks)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    try:
+        grid = parseGrid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    results = runSweep(grid, args.runs, args.seed, args.max_ticks,
+                       args.policy, args.workers)
+    elapsed = time.perf_counter() - start
+
+    for params, summary in results:
+        printSummary(params, summary)
+    totalRuns = args.runs * len(grid)
+    print(f"{totalRuns} runs in {elapsed:.1f}s on {args.workers} workers "
+          f"({totalRuns / elapsed * 60:.0f} runs/min)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "policy": args.policy,
+                    "runs": args.runs,
+                    "seed": args.seed,
+                    "maxTicks": args.max_ticks,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                },
+                "results": [
+                    {"params": params, "summary": summary}
+                    for params, summary in results
+                ],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()